@@ -8,12 +8,64 @@ AnkiConnect 接口模块
 import requests
 import json
 import time
+from http_transport import create_session
+
+# AnkiConnect拒绝重复卡片时错误信息中包含的文字
+DUPLICATE_ERROR = "duplicate"
+DUPLICATE_MESSAGE = "卡片已存在于Anki中（duplicate），跳过添加"
+
+# 模板或字段不匹配时的错误信息（只有这类错误说明模板结构缓存已失效）
+SCHEMA_ERRORS = ("model was not found", "field", "is empty")
+
+
+def is_duplicate_error(message):
+    """添加失败是否因为卡片已存在"""
+    return DUPLICATE_ERROR in str(message)
+
+
+def is_schema_error(message):
+    """添加失败是否因为模板或字段不存在"""
+    message = str(message)
+    return any(marker in message for marker in SCHEMA_ERRORS)
+
+class AnkiBatch:
+    """收集多个 AnkiConnect 操作，通过一次 multi 请求发送"""
+    
+    def __init__(self, anki):
+        self.anki = anki
+        self.actions = []
+    
+    def add(self, action, params=None):
+        """添加一个操作，返回其在结果列表中的位置"""
+        self.actions.append((action, params))
+        return len(self.actions) - 1
+    
+    def send(self):
+        """发送所有操作，返回每个操作的 (结果, 错误) 列表"""
+        if not self.actions:
+            return []
+        return self.anki.multi(self.actions)
 
 class AnkiConnect:
-    def __init__(self, api_key="MY_SECRET_KEY_123", host="127.0.0.1", port=8765):
+    def __init__(self, api_key="MY_SECRET_KEY_123", host="127.0.0.1", port=8765,
+                 latency_tracker=None, session=None):
         self.api_key = api_key
         self.base_url = f"http://{host}:{port}"
-        self.session = requests.Session()
+        # 本地单主机，少量长连接即可；POST只在连接失败时重试一次
+        self.session = session or create_session(pool_connections=1, pool_maxsize=4, retries=1)
+        # 可选的延迟统计器，用于推算自适应超时
+        self.latency_tracker = latency_tracker
+        
+        # 模板结构缓存：模板列表、各模板字段、上次成功添加卡片的模板
+        self.model_names_cache = None
+        self.model_fields_cache = {}
+        self.last_successful_model = None
+        
+    def _get_timeout(self):
+        """获取请求超时时间（有延迟统计时自适应，否则固定10秒）"""
+        if self.latency_tracker is None:
+            return 10
+        return self.latency_tracker.get_timeout("ankiconnect", 10)
         
     def _invoke(self, action, params=None):
         """调用 AnkiConnect API"""
@@ -27,8 +79,12 @@ class AnkiConnect:
             "params": params
         }
         
+        timeout = self._get_timeout()
+        start = time.monotonic()
         try:
-            response = self.session.post(self.base_url, json=request_data, timeout=10)
+            response = self.session.post(self.base_url, json=request_data, timeout=timeout)
+            if self.latency_tracker is not None:
+                self.latency_tracker.record("ankiconnect", time.monotonic() - start)
             response.raise_for_status()
             
             result = response.json()
@@ -36,11 +92,65 @@ class AnkiConnect:
                 raise Exception(f"AnkiConnect 错误: {result['error']}")
                 
             return result.get("result")
+        except requests.exceptions.Timeout as e:
+            if self.latency_tracker is not None:
+                self.latency_tracker.record("ankiconnect", timeout, timed_out=True)
+            raise Exception(f"连接 Anki 超时: {str(e)}")
         except requests.exceptions.RequestException as e:
             raise Exception(f"连接 Anki 失败: {str(e)}")
         except Exception as e:
             raise Exception(f"AnkiConnect 调用失败: {str(e)}")
     
+    def multi(self, actions):
+        """通过一次 multi 请求执行多个操作
+        
+        actions为 (操作名, 参数) 列表，返回与之对应的 (结果, 错误) 列表；
+        单个操作失败不影响其他操作，整个请求失败时抛出异常。
+        """
+        request_actions = [
+            {"action": action, "version": 6, "params": params or {}}
+            for action, params in actions
+        ]
+        responses = self._invoke("multi", {"actions": request_actions})
+        
+        results = []
+        for response in responses:
+            if isinstance(response, dict) and set(response) == {"result", "error"}:
+                results.append((response["result"], response["error"]))
+            else:
+                results.append((response, None))
+        return results
+    
+    def batch(self):
+        """创建操作批次，用法: batch = anki.batch(); batch.add(...); batch.send()"""
+        return AnkiBatch(self)
+    
+    def prepare(self, deck_name="阅读中的收获"):
+        """一次请求完成启动准备：检查版本、确保牌组存在、缓存模板列表"""
+        batch = self.batch()
+        version_index = batch.add("version")
+        deck_index = batch.add("createDeck", {"deck": deck_name})
+        models_index = batch.add("modelNames")
+        
+        try:
+            results = batch.send()
+        except Exception as e:
+            return False, str(e)
+        
+        version, version_error = results[version_index]
+        if version_error:
+            return False, f"AnkiConnect 错误: {version_error}"
+        
+        models, models_error = results[models_index]
+        if not models_error:
+            self.model_names_cache = models
+        
+        message = f"连接成功，AnkiConnect 版本: {version}"
+        _, deck_error = results[deck_index]
+        if deck_error:
+            message += f"（创建牌组 '{deck_name}' 失败: {deck_error}）"
+        return True, message
+    
     def test_connection(self):
         """测试与 Anki 的连接"""
         try:
@@ -66,15 +176,31 @@ class AnkiConnect:
         except Exception as e:
             return False, f"创建牌组失败: {str(e)}"
     
-    def get_model_names(self):
-        """获取所有模板名称"""
+    def get_model_names(self, refresh=False):
+        """获取所有模板名称（结果缓存）"""
+        if self.model_names_cache is not None and not refresh:
+            return self.model_names_cache
+        
         try:
             models = self._invoke("modelNames")
+            self.model_names_cache = models
             return models
         except Exception as e:
             print(f"获取模板失败: {e}")
             return []
     
+    def get_model_field_names(self, model_name):
+        """获取模板的字段名称（结果缓存）"""
+        if model_name not in self.model_fields_cache:
+            self.model_fields_cache[model_name] = self._invoke("modelFieldNames", {"modelName": model_name})
+        return self.model_fields_cache[model_name]
+    
+    def invalidate_model_cache(self):
+        """清空模板结构缓存（模板或字段不存在时）"""
+        self.model_names_cache = None
+        self.model_fields_cache = {}
+        self.last_successful_model = None
+    
     def create_basic_model(self):
         """创建基础模板"""
         model_data = {
@@ -102,71 +228,154 @@ class AnkiConnect:
         if tags is None:
             tags = ["books", "translation"]
         
+        # 优先使用上次成功的模板，只需一次请求
+        if self.last_successful_model:
+            fields = self._build_note_fields(self.last_successful_model, front, back)
+            if fields is not None:
+                success, message = self._try_add_note(self.last_successful_model, fields, deck_name, tags)
+                # 成功、重复卡片或连接失败都与模板无关，保留模板缓存
+                if success or not is_schema_error(message):
+                    return success, message
+            # 模板或字段不存在，模板结构已变化，重新探测
+            self.invalidate_model_cache()
+        
         # 获取可用的模板
         models = self.get_model_names()
+        candidates = self._candidate_models(models)
         
-        # 尝试不同的模板和字段组合
-        attempts = [
-            ("Basic", {"Front": front, "Back": back}),
-            ("基础", {"正面": front, "背面": back}),
-            ("Cloze", {"Text": f"{front}<br><br>{back}"}),
-        ]
+        # 一次请求查询所有其他模板的字段
+        self._prefetch_model_fields([model for model in candidates if model not in ["Basic", "基础", "Cloze"]])
         
-        # 如果有其他模板，也尝试使用
-        for model in models:
-            if model not in ["Basic", "基础", "Cloze"]:
-                try:
-                    model_fields = self._invoke("modelFieldNames", {"modelName": model})
-                    if len(model_fields) >= 2:
-                        fields = {
-                            model_fields[0]: front,
-                            model_fields[1]: back
-                        }
-                        # 其他字段填空
-                        for field in model_fields[2:]:
-                            fields[field] = ""
-                        attempts.append((model, fields))
-                except:
-                    continue
-        
-        # 尝试每种组合
-        for model_name, fields in attempts:
-            if model_name in models or model_name == "Basic":
-                note = {
-                    "deckName": deck_name,
-                    "modelName": model_name,
-                    "fields": fields,
-                    "tags": tags
-                }
-                
-                try:
-                    note_id = self._invoke("addNote", {"note": note})
-                    return True, f"卡片添加成功 (模板: {model_name}, ID: {note_id})"
-                except Exception as e:
-                    print(f"模板 {model_name} 失败: {e}")
-                    continue
+        attempts = []
+        for model_name in candidates:
+            fields = self._build_note_fields(model_name, front, back)
+            if fields is not None:
+                attempts.append((model_name, fields))
+        
+        # 一次请求检查哪些模板可以添加
+        addable = self._check_addable(attempts, deck_name, tags)
+        
+        # 按优先级尝试每种组合
+        for (model_name, fields), ok in zip(attempts, addable):
+            if not ok:
+                if model_name in models:
+                    # 首选的现有模板中卡片已存在，视为重复跳过，不换用其他模板重复添加
+                    return False, DUPLICATE_MESSAGE
+                continue
+            success, message = self._try_add_note(model_name, fields, deck_name, tags)
+            if success:
+                self.last_successful_model = model_name
+                return success, message
         
         return False, "所有模板都无法添加卡片，请检查 Anki 设置"
     
-    def add_notes_batch(self, notes_data, deck_name="阅读中的收获"):
-        """批量添加卡片"""
+    def _prefetch_model_fields(self, model_names):
+        """通过一次 multi 请求缓存多个模板的字段名称"""
+        missing = [model for model in model_names if model not in self.model_fields_cache]
+        if not missing:
+            return
+        
+        try:
+            results = self.multi([("modelFieldNames", {"modelName": model}) for model in missing])
+        except Exception as e:
+            print(f"批量获取模板字段失败: {e}")
+            return
+        
+        for model, (fields, error) in zip(missing, results):
+            if not error:
+                self.model_fields_cache[model] = fields
+    
+    def _check_addable(self, attempts, deck_name, tags):
+        """通过一次 canAddNotes 请求检查每种组合是否可添加，检查失败时视为均可尝试"""
+        notes = [
+            {"deckName": deck_name, "modelName": model_name, "fields": fields, "tags": tags}
+            for model_name, fields in attempts
+        ]
+        try:
+            return self._invoke("canAddNotes", {"notes": notes})
+        except Exception as e:
+            print(f"检查卡片可添加性失败: {e}")
+            return [True] * len(attempts)
+    
+    def _candidate_models(self, models):
+        """按优先级列出可尝试的模板"""
+        candidates = [model for model in ["Basic", "基础", "Cloze"] if model in models or model == "Basic"]
+        # 如果有其他模板，也尝试使用
+        candidates.extend(model for model in models if model not in ["Basic", "基础", "Cloze"])
+        return candidates
+    
+    def _build_note_fields(self, model_name, front, back):
+        """根据模板生成字段内容，模板不可用时返回None"""
+        if model_name == "Basic":
+            return {"Front": front, "Back": back}
+        if model_name == "基础":
+            return {"正面": front, "背面": back}
+        if model_name == "Cloze":
+            return {"Text": f"{front}<br><br>{back}"}
+        
+        try:
+            model_fields = self.get_model_field_names(model_name)
+        except Exception:
+            return None
+        if len(model_fields) < 2:
+            return None
+        
+        fields = {
+            model_fields[0]: front,
+            model_fields[1]: back
+        }
+        # 其他字段填空
+        for field in model_fields[2:]:
+            fields[field] = ""
+        return fields
+    
+    def _try_add_note(self, model_name, fields, deck_name, tags):
+        """用指定模板添加一张卡片"""
+        note = {
+            "deckName": deck_name,
+            "modelName": model_name,
+            "fields": fields,
+            "tags": tags
+        }
+        
+        try:
+            note_id = self._invoke("addNote", {"note": note})
+            return True, f"卡片添加成功 (模板: {model_name}, ID: {note_id})"
+        except Exception as e:
+            print(f"模板 {model_name} 失败: {e}")
+            return False, str(e)
+    
+    def add_notes(self, notes_data, deck_name="阅读中的收获"):
+        """通过一次 addNotes 请求批量添加卡片
+        
+        使用上次成功添加卡片的模板（默认Basic），返回与notes_data对应的卡片ID列表，
+        添加失败的位置为None；连接失败时抛出异常。
+        """
+        model_name = self.last_successful_model or "Basic"
         notes = []
         for note_data in notes_data:
+            front = note_data.get("front", "")
+            back = note_data.get("back", "")
+            fields = self._build_note_fields(model_name, front, back)
+            if fields is None:
+                model_name = "Basic"
+                fields = self._build_note_fields(model_name, front, back)
             note = {
                 "deckName": deck_name,
-                "modelName": "Basic",
-                "fields": {
-                    "Front": note_data.get("front", ""),
-                    "Back": note_data.get("back", "")
-                },
+                "modelName": model_name,
+                "fields": fields,
                 "tags": note_data.get("tags", ["books", "translation"])
             }
             notes.append(note)
         
+        return self._invoke("addNotes", {"notes": notes})
+    
+    def add_notes_batch(self, notes_data, deck_name="阅读中的收获"):
+        """批量添加卡片"""
         try:
-            result = self._invoke("addNotes", {"notes": notes})
+            result = self.add_notes(notes_data, deck_name)
             success_count = len([r for r in result if r is not None])
-            return True, f"批量添加完成，成功: {success_count}/{len(notes)}"
+            return True, f"批量添加完成，成功: {success_count}/{len(notes_data)}"
         except Exception as e:
             return False, f"批量添加失败: {str(e)}"
     
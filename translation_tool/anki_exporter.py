@@ -2,15 +2,45 @@
 # -*- coding: utf-8 -*-
 """
 Anki词卡导出工具
-支持多种格式导出和自定义模板
+支持多种格式导出和自定义模板；所有导出方法接受任意可迭代对象（列表或生成器），
+逐张卡片写入，内存占用与卡片总数无关
 """
 
 import json
 import csv
+import gzip
 import html
+import re
+import string
+from contextlib import ExitStack
 from datetime import datetime
 import os
 
+from apkg_writer import ApkgWriter
+
+# 导出文件写缓冲大小
+WRITE_BUFFER_SIZE = 1 << 16
+
+# export_multi 支持的格式
+EXPORT_FORMATS = ('txt', 'csv', 'json', 'jsonl', 'apkg')
+
+# 模板可用字段
+TEMPLATE_FIELDS = ('word', 'phonetic', 'translations', 'definitions', 'examples', 'created_time')
+
+# 一次扫描完成HTML清理：连续三个以上的<br>（中间可带一个空格）合并为两个、移除空标签
+CLEANUP_PATTERN = re.compile(r'(?:<br>){2}(?: ?<br>)+|<b></b>|<i></i>')
+
+
+def needs_cleanup(text):
+    """快速判断是否需要清理（大多数卡片不需要，避免正则扫描）"""
+    return '<br><br><br>' in text or '<br><br> <br>' in text or '<b></b>' in text or '<i></i>' in text
+
+
+def replace_cleanup_match(match):
+    """多余的<br>合并为两个，空标签删除"""
+    return '<br><br>' if match.group().startswith('<br>') else ''
+
+
 class AnkiExporter:
     def __init__(self):
         self.templates = {
@@ -30,123 +60,270 @@ class AnkiExporter:
                 'back': '{definitions}<br><br>{examples}'
             }
         }
+        # 模板字符串 → 编译后的渲染函数
+        self.compiled_templates = {}
     
     def export_to_txt(self, cards_data, filename, template='basic'):
-        """导出为Anki TXT格式"""
-        template_config = self.templates.get(template, self.templates['basic'])
+        """导出为Anki TXT格式，返回卡片数量"""
+        render_front, render_back = self.get_renderers(template)
         
-        with open(filename, 'w', encoding='utf-8') as f:
+        count = 0
+        with open(filename, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
             for card in cards_data:
-                front = self.format_card_side(template_config['front'], card)
-                back = self.format_card_side(template_config['back'], card)
+                front = render_front(card)
+                back = render_back(card)
                 
                 # Anki格式：正面\t背面\t标签
                 f.write(f"{front}\t{back}\ttranslation\n")
+                count += 1
+        return count
     
     def export_to_csv(self, cards_data, filename, template='basic'):
-        """导出为CSV格式"""
-        template_config = self.templates.get(template, self.templates['basic'])
+        """导出为CSV格式，返回卡片数量"""
+        render_front, render_back = self.get_renderers(template)
         
-        with open(filename, 'w', encoding='utf-8', newline='') as f:
+        count = 0
+        with open(filename, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as f:
             writer = csv.writer(f)
             
             # 写入标题行
             writer.writerow(['Front', 'Back', 'Tags'])
             
             for card in cards_data:
-                front = self.format_card_side(template_config['front'], card)
-                back = self.format_card_side(template_config['back'], card)
+                front = render_front(card)
+                back = render_back(card)
                 
                 writer.writerow([front, back, 'translation'])
+                count += 1
+        return count
     
     def export_to_json(self, cards_data, filename):
-        """导出为JSON格式（用于备份）"""
-        export_data = {
-            'export_time': datetime.now().isoformat(),
-            'total_cards': len(cards_data),
-            'cards': cards_data
-        }
+        """导出为JSON格式（用于备份），逐张写入卡片数组，返回卡片数量"""
+        count = 0
+        with open(filename, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            # 卡片总数在写完后才知道，放在卡片数组之后
+            f.write('{"export_time": %s, "cards": [' % json.dumps(datetime.now().isoformat()))
+            for card in cards_data:
+                f.write(",\n  " if count else "\n  ")
+                f.write(json.dumps(card, ensure_ascii=False))
+                count += 1
+            f.write('\n], "total_cards": %d}\n' % count)
+        return count
+    
+    def export_to_jsonl(self, cards_data, filename):
+        """导出为JSON Lines格式（每行一张卡片，可追加、可逐行读取），返回卡片数量"""
+        count = 0
+        with open(filename, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            for card in cards_data:
+                f.write(json.dumps(card, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        return count
+    
+    @staticmethod
+    def iter_jsonl(filename):
+        """逐行读取JSON Lines文件中的卡片（生成器，可直接传给各导出方法）"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    
+    def export_to_apkg(self, cards_data, filename, template='basic', deck_name="翻译词卡"):
+        """导出为Anki牌组包(.apkg)，返回卡片数量"""
+        render_front, render_back = self.get_renderers(template)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2)
+        notes = ((render_front(card), render_back(card), ['translation'])
+                 for card in cards_data)
+        return ApkgWriter(deck_name).write(filename, notes)
     
-    def format_card_side(self, template, card):
-        """格式化卡片内容"""
-        # 准备数据
-        data = {
-            'word': card.get('word', ''),
-            'phonetic': card.get('phonetic', ''),
-            'translations': card.get('translations', ''),
-            'definitions': card.get('definitions', ''),
-            'examples': card.get('examples', ''),
-            'created_time': card.get('created_time', '')
-        }
+    def export_multi(self, cards_data, base_filename, formats=('txt', 'csv', 'json'),
+                     template='basic', compress=False, deck_name="翻译词卡"):
+        """一次遍历卡片同时导出多种格式，每张卡片只渲染一次
+        
+        compress=True 时文本格式写为 .gz（.apkg 本身已压缩）；
+        返回 (格式→文件名 字典, 卡片数量)
+        """
+        formats = list(dict.fromkeys(formats))
+        unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+        if unknown:
+            raise ValueError(f"不支持的导出格式: {', '.join(unknown)}")
         
-        # 处理空值
-        for key, value in data.items():
-            if not value:
-                data[key] = ''
-            elif key == 'phonetic' and value:
-                data[key] = f"[{value}]"
+        base_name = os.path.splitext(str(base_filename))[0]
+        filenames = {}
+        for fmt in formats:
+            filename = f"{base_name}.{fmt}"
+            if compress and fmt != 'apkg':
+                filename += ".gz"
+            filenames[fmt] = filename
         
-        # 格式化模板
+        render_front, render_back = self.get_renderers(template)
+        needs_render = any(fmt in formats for fmt in ('txt', 'csv', 'apkg'))
+        
+        count = 0
+        with ExitStack() as stack:
+            txt_file = csv_writer = json_file = jsonl_file = apkg_writer = None
+            if 'txt' in filenames:
+                txt_file = stack.enter_context(self._open_output(filenames['txt'], compress))
+            if 'csv' in filenames:
+                csv_file = stack.enter_context(self._open_output(filenames['csv'], compress, newline=''))
+                csv_writer = csv.writer(csv_file)
+                csv_writer.writerow(['Front', 'Back', 'Tags'])
+            if 'json' in filenames:
+                json_file = stack.enter_context(self._open_output(filenames['json'], compress))
+                json_file.write('{"export_time": %s, "cards": [' % json.dumps(datetime.now().isoformat()))
+            if 'jsonl' in filenames:
+                jsonl_file = stack.enter_context(self._open_output(filenames['jsonl'], compress))
+            if 'apkg' in filenames:
+                apkg_writer = ApkgWriter(deck_name)
+                apkg_writer.open(filenames['apkg'])
+            
+            try:
+                for card in cards_data:
+                    if needs_render:
+                        front = render_front(card)
+                        back = render_back(card)
+                    if txt_file is not None:
+                        txt_file.write(f"{front}\t{back}\ttranslation\n")
+                    if csv_writer is not None:
+                        csv_writer.writerow([front, back, 'translation'])
+                    if json_file is not None or jsonl_file is not None:
+                        card_json = json.dumps(card, ensure_ascii=False)
+                        if json_file is not None:
+                            json_file.write(",\n  " if count else "\n  ")
+                            json_file.write(card_json)
+                        if jsonl_file is not None:
+                            jsonl_file.write(card_json)
+                            jsonl_file.write("\n")
+                    if apkg_writer is not None:
+                        apkg_writer.add_note(front, back, ['translation'])
+                    count += 1
+                
+                if json_file is not None:
+                    json_file.write('\n], "total_cards": %d}\n' % count)
+            except BaseException:
+                if apkg_writer is not None:
+                    apkg_writer.abort()
+                raise
+            
+            if apkg_writer is not None:
+                apkg_writer.close()
+        
+        return filenames, count
+    
+    def _open_output(self, filename, compress, newline=None):
+        """打开带缓冲的输出文件，compress=True 时写入gzip"""
+        if compress:
+            return gzip.open(filename, 'wt', encoding='utf-8', newline=newline)
+        return open(filename, 'w', encoding='utf-8', newline=newline, buffering=WRITE_BUFFER_SIZE)
+    
+    def format_card_side(self, template, card):
+        """格式化卡片内容"""
+        return self.compile_template(template)(card)
+    
+    def get_renderers(self, template='basic'):
+        """获取模板正面和背面的渲染函数"""
+        template_config = self.templates.get(template, self.templates['basic'])
+        return (self.compile_template(template_config['front']),
+                self.compile_template(template_config['back']))
+    
+    def compile_template(self, template):
+        """将模板编译为渲染函数 render(card)，同一模板只解析一次"""
+        render = self.compiled_templates.get(template)
+        if render is None:
+            render = self._compile_template(template)
+            self.compiled_templates[template] = render
+        return render
+    
+    def _compile_template(self, template):
+        """解析模板：字面文本转为 % 格式串，每个字段生成一个取值函数"""
+        formatter = string.Formatter()
+        format_parts = []
+        getters = []
         try:
-            formatted = template.format(**data)
-            # 清理多余的空行和空格
-            formatted = self.clean_html(formatted)
-            return formatted
-        except KeyError as e:
+            for literal, field_name, format_spec, conversion in formatter.parse(template):
+                format_parts.append(literal.replace('%', '%%'))
+                if field_name is None:
+                    continue
+                format_parts.append('%s')
+                getters.append(self._compile_field(formatter, field_name, format_spec, conversion))
+        except (KeyError, ValueError) as e:
             print(f"模板格式错误: {e}")
-            return f"{data['word']} - {data['translations']}"
+            getters = None
+        
+        if getters is None:
+            return self._render_fallback
+        
+        format_string = ''.join(format_parts)
+        cleanup = CLEANUP_PATTERN.sub
+        
+        # 取值、拼接和HTML清理在同一个函数中完成，不再经过中间数据字典
+        def render(card):
+            text = format_string % tuple([getter(card) for getter in getters])
+            if needs_cleanup(text):
+                text = cleanup(replace_cleanup_match, text)
+            return text.strip()
+        
+        return render
     
-    def clean_html(self, text):
-        """清理HTML格式"""
-        # 移除多余的<br>标签
-        text = text.replace('<br><br><br>', '<br><br>')
-        text = text.replace('<br><br> <br>', '<br><br>')
+    def _compile_field(self, formatter, field_name, format_spec, conversion):
+        """生成单个字段的取值函数（空值→空字符串，音标加方括号）"""
+        name = re.match(r'[^.\[]*', field_name).group()
+        if name not in TEMPLATE_FIELDS:
+            raise KeyError(name)
         
-        # 移除空的HTML标签
-        text = text.replace('<b></b>', '')
-        text = text.replace('<i></i>', '')
+        if name == 'phonetic':
+            def value_of(card):
+                value = card.get('phonetic')
+                return f"[{value}]" if value else ''
+        else:
+            def value_of(card):
+                return card.get(name) or ''
         
-        # 清理首尾空白
-        text = text.strip()
+        if field_name == name and not format_spec and not conversion:
+            return value_of
         
-        return text
+        # 带属性/下标访问、格式说明或转换的字段走通用路径
+        def formatted_value_of(card):
+            value, _ = formatter.get_field(field_name, (), {name: value_of(card)})
+            return formatter.format_field(formatter.convert_field(value, conversion), format_spec)
+        return formatted_value_of
+    
+    def _render_fallback(self, card):
+        """模板无法使用时的简单格式"""
+        return f"{card.get('word') or ''} - {card.get('translations') or ''}"
+    
+    def clean_html(self, text):
+        """清理HTML格式：一次扫描合并多余的<br>标签、移除空的HTML标签，并去除首尾空白"""
+        if needs_cleanup(text):
+            text = CLEANUP_PATTERN.sub(replace_cleanup_match, text)
+        return text.strip()
     
     def create_anki_deck_file(self, cards_data, filename, deck_name="翻译词卡"):
-        """创建Anki牌组文件（.apkg格式需要额外库）"""
-        # 这里创建一个包含导入说明的文件
+        """创建Anki牌组文件(.apkg)和导入说明"""
         base_name = os.path.splitext(filename)[0]
-        txt_file = f"{base_name}.txt"
+        apkg_file = f"{base_name}.apkg"
         instruction_file = f"{base_name}_导入说明.txt"
         
-        # 导出TXT格式
-        self.export_to_txt(cards_data, txt_file)
+        # 导出牌组包
+        card_count = self.export_to_apkg(cards_data, apkg_file, deck_name=deck_name)
         
         # 创建导入说明
         instructions = f"""Anki词卡导入说明
 
-文件: {os.path.basename(txt_file)}
+文件: {os.path.basename(apkg_file)}
 牌组名称: {deck_name}
-词卡数量: {len(cards_data)}
+词卡数量: {card_count}
 导出时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 导入步骤:
 1. 打开Anki软件
-2. 点击"导入文件"
-3. 选择文件: {os.path.basename(txt_file)}
-4. 设置字段分隔符为"制表符"
-5. 设置字段映射:
-   - 字段1: 正面
-   - 字段2: 背面  
-   - 字段3: 标签
-6. 选择目标牌组: {deck_name}
-7. 点击"导入"完成
+2. 双击 {os.path.basename(apkg_file)}，或点击"导入文件"选择该文件
+3. 卡片会自动导入到牌组: {deck_name}
 
 注意事项:
-- 确保Anki版本支持HTML格式
-- 如有重复卡片，选择更新或跳过
+- 牌组包已包含正面/背面模板，无需设置字段映射
+- 重复导入同一张卡片时，Anki会更新而不是重复添加
 - 建议先备份现有牌组
 
 模板建议:
@@ -158,7 +335,7 @@ class AnkiExporter:
         with open(instruction_file, 'w', encoding='utf-8') as f:
             f.write(instructions)
         
-        return txt_file, instruction_file
+        return apkg_file, instruction_file
     
     def get_available_templates(self):
         """获取可用模板列表"""
@@ -175,9 +352,10 @@ class AnkiExporter:
     def preview_card(self, card_data, template='basic'):
         """预览卡片效果"""
         template_config = self.templates.get(template, self.templates['basic'])
+        render_front, render_back = self.get_renderers(template)
         
-        front = self.format_card_side(template_config['front'], card_data)
-        back = self.format_card_side(template_config['back'], card_data)
+        front = render_front(card_data)
+        back = render_back(card_data)
         
         return {
             'front': front,
@@ -215,12 +393,12 @@ if __name__ == "__main__":
     exporter.export_to_json(test_cards, 'test_cards.json')
     
     # 创建完整的Anki导入包
-    txt_file, instruction_file = exporter.create_anki_deck_file(
+    apkg_file, instruction_file = exporter.create_anki_deck_file(
         test_cards, 'my_vocabulary.apkg', '我的词汇'
     )
     
     print(f"导出完成:")
-    print(f"- TXT文件: {txt_file}")
+    print(f"- 牌组包: {apkg_file}")
     print(f"- 说明文件: {instruction_file}")
     
     # 预览卡片
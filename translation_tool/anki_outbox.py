@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Anki 导入队列模块
+卡片先写入本地持久化队列，后台线程通过 addNotes 批量导入 Anki；
+Anki 未打开时卡片保留在队列中，恢复连接后自动重试
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from anki_connect import is_duplicate_error
+
+# 卡片状态
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+# 卡片已存在于Anki中，不再重试
+STATUS_DUPLICATE = "duplicate"
+
+
+class AnkiOutbox:
+    def __init__(self, db_path, anki, deck_name="阅读中的收获", batch_size=50,
+                 max_attempts=5, retry_interval=5, max_retry_interval=120, on_status=None):
+        self.db_path = db_path
+        self.anki = anki
+        self.deck_name = deck_name
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        # 状态回调: on_status(outbox_id, status, message, card)，在后台线程中调用
+        self.on_status = on_status
+
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                front TEXT NOT NULL,
+                back TEXT NOT NULL,
+                tags TEXT,
+                card TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                note_id INTEGER,
+                last_error TEXT,
+                created_time TEXT,
+                updated_time TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status)")
+        self.conn.commit()
+
+    def enqueue(self, front, back, tags, card=None):
+        """将卡片写入队列并唤醒后台线程，立即返回队列ID"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO outbox (front, back, tags, card, status, created_time, updated_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (front, back, json.dumps(tags, ensure_ascii=False),
+                 json.dumps(card, ensure_ascii=False) if card is not None else None,
+                 STATUS_PENDING, now, now)
+            )
+            self.conn.commit()
+            outbox_id = cursor.lastrowid
+
+        self.wake_event.set()
+        return outbox_id
+
+    def start(self):
+        """启动后台导入线程"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="anki-outbox", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2):
+        """停止后台导入线程（未导入的卡片保留在队列中）"""
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+
+    def wake(self):
+        """立即尝试导入（例如重新连接Anki后）"""
+        self.wake_event.set()
+
+    def _run(self):
+        """后台线程：有待导入卡片时批量发送，连接失败时指数退避重试"""
+        interval = self.retry_interval
+        while not self.stop_event.is_set():
+            try:
+                flushed = self.flush()
+                interval = self.retry_interval
+            except Exception as e:
+                print(f"⚠️ Anki导入队列暂停: {e}")
+                flushed = 0
+                interval = min(interval * 2, self.max_retry_interval)
+
+            # 本轮导入了一整批，说明可能还有更多，继续发送
+            if flushed >= self.batch_size:
+                continue
+
+            self.wake_event.wait(interval if self.get_counts()[STATUS_PENDING] else None)
+            self.wake_event.clear()
+
+    def flush(self):
+        """发送一批待导入卡片，返回本批处理数量；无法连接Anki时抛出异常"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, front, back, tags, card, attempts FROM outbox "
+                "WHERE status = ? ORDER BY attempts, id LIMIT ?",
+                (STATUS_PENDING, self.batch_size)
+            ).fetchall()
+        if not rows:
+            return 0
+
+        anki = self.anki
+        processed = 0
+        if anki.last_successful_model is None:
+            # 还不知道可用的模板：确认连接后先用单张卡片探测（重复卡片无法确定模板，继续探测下一张）
+            success, message = anki.prepare(self.deck_name)
+            if not success:
+                raise Exception(message)
+            while rows and anki.last_successful_model is None:
+                status = self._send_single(anki, rows[0])
+                processed += 1
+                rows = rows[1:]
+                if status != STATUS_DUPLICATE:
+                    break
+            if anki.last_successful_model is None or not rows:
+                return processed
+
+        notes_data = [{'front': front, 'back': back, 'tags': json.loads(tags) if tags else []}
+                      for _, front, back, tags, _, _ in rows]
+        try:
+            note_ids = anki.add_notes(notes_data, self.deck_name)
+        except Exception as e:
+            if self._is_connection_error(e):
+                raise
+            # 新版AnkiConnect在部分卡片被拒绝时整体报错，改为逐张导入以获得每张卡片的状态
+            for row in rows:
+                self._send_single(anki, row)
+            return processed + len(rows)
+
+        # 使用已确认可用的模板批量添加，被拒绝的卡片是重复卡片，不重试也不清空模板缓存
+        for row, note_id in zip(rows, note_ids):
+            if note_id is not None:
+                self._mark(row, STATUS_SENT, note_id=note_id, message=f"已导入Anki (ID: {note_id})")
+            else:
+                self._mark(row, STATUS_DUPLICATE, message="卡片已存在于Anki中，跳过")
+        return processed + len(rows)
+
+    def _is_connection_error(self, error):
+        """判断是否为无法连接Anki的错误（此时卡片保留在队列中等待重试）"""
+        return "连接 Anki" in str(error)
+
+    def _send_single(self, anki, row):
+        """用 add_note 导入单张卡片（会探测可用模板），返回卡片的新状态"""
+        _, front, back, tags, _, _ = row
+        success, message = anki.add_note(front, back, self.deck_name, json.loads(tags) if tags else None)
+        if success:
+            self._mark(row, STATUS_SENT, message=message)
+            return STATUS_SENT
+        if is_duplicate_error(message):
+            self._mark(row, STATUS_DUPLICATE, message=message)
+            return STATUS_DUPLICATE
+        return self._mark_attempt_failed(row, message)
+
+    def _mark_attempt_failed(self, row, message):
+        """记录一次失败，超过最大尝试次数后标记为失败"""
+        attempts = row[5] + 1
+        status = STATUS_FAILED if attempts >= self.max_attempts else STATUS_PENDING
+        self._mark(row, status, attempts=attempts, message=message)
+        return status
+
+    def _mark(self, row, status, note_id=None, attempts=None, message=""):
+        """更新卡片状态并通知回调"""
+        outbox_id = row[0]
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock:
+            self.conn.execute(
+                "UPDATE outbox SET status = ?, note_id = COALESCE(?, note_id), "
+                "attempts = COALESCE(?, attempts), last_error = ?, updated_time = ? WHERE id = ?",
+                (status, note_id, attempts, message if status != STATUS_SENT else None, now, outbox_id)
+            )
+            self.conn.commit()
+
+        if self.on_status is not None:
+            card = json.loads(row[4]) if row[4] else None
+            try:
+                self.on_status(outbox_id, status, message, card)
+            except Exception as e:
+                print(f"⚠️ 导入状态回调失败: {e}")
+
+    def get_counts(self):
+        """统计各状态的卡片数量"""
+        counts = {STATUS_PENDING: 0, STATUS_SENT: 0, STATUS_FAILED: 0, STATUS_DUPLICATE: 0}
+        with self.lock:
+            for status, count in self.conn.execute(
+                    "SELECT status, COUNT(*) FROM outbox GROUP BY status"):
+                counts[status] = count
+        return counts
+
+    def get_status(self, outbox_id):
+        """查询单张卡片的导入状态"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, attempts, note_id, last_error FROM outbox WHERE id = ?",
+                (outbox_id,)
+            ).fetchone()
+        if not row:
+            return None
+        status, attempts, note_id, last_error = row
+        return {'status': status, 'attempts': attempts, 'note_id': note_id, 'last_error': last_error}
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Anki牌组包(.apkg)生成模块
+不依赖Anki或第三方库：在本地写入 SQLite 格式的牌组集合并打包为 zip，
+可在Anki中直接双击或通过"导入文件"导入
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import zipfile
+
+# 固定的模板ID：多次导出的卡片归入同一个笔记类型，重复导入时按GUID更新而不是新建
+MODEL_ID = 1718250000000
+
+SCHEMA = """
+CREATE TABLE col (
+    id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null,
+    usn integer not null, ls integer not null, conf text not null,
+    models text not null, decks text not null, dconf text not null, tags text not null
+);
+CREATE TABLE notes (
+    id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null,
+    flds text not null, sfld integer not null, csum integer not null,
+    flags integer not null, data text not null
+);
+CREATE TABLE cards (
+    id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null,
+    type integer not null, queue integer not null, due integer not null,
+    ivl integer not null, factor integer not null, reps integer not null,
+    lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null
+);
+CREATE TABLE revlog (
+    id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null,
+    factor integer not null, time integer not null, type integer not null
+);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+CARD_CSS = """.card {
+ font-family: arial;
+ font-size: 20px;
+ text-align: center;
+ color: black;
+ background-color: white;
+}
+"""
+
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+class ApkgWriter:
+    def __init__(self, deck_name="阅读中的收获", model_name="智能翻译-基础"):
+        self.deck_name = deck_name
+        self.model_name = model_name
+        # 牌组ID由名称决定，同名牌组多次导出会合并
+        self.deck_id = int(hashlib.sha1(deck_name.encode('utf-8')).hexdigest()[:8], 16) + 1
+
+    def write(self, filename, notes):
+        """将 (正面, 背面, 标签列表) 迭代写入.apkg文件，返回写入的卡片数量"""
+        self.open(filename)
+        try:
+            for front, back, tags in notes:
+                self.add_note(front, back, tags)
+        except BaseException:
+            self.abort()
+            raise
+        return self.close()
+
+    def open(self, filename):
+        """开始写入.apkg文件，随后逐张调用 add_note，最后调用 close"""
+        self.filename = str(filename)
+        self.collection_path = self.filename + ".anki2.tmp"
+        if os.path.exists(self.collection_path):
+            os.remove(self.collection_path)
+
+        self.conn = sqlite3.connect(self.collection_path)
+        self.now = int(time.time())
+        self.count = 0
+        self.conn.executescript(SCHEMA)
+        self._write_collection(self.conn, self.now)
+
+    def add_note(self, front, back, tags):
+        """写入一张卡片（不需要一次性持有全部卡片）"""
+        self.count += 1
+        note_id = self.now * 1000 + self.count
+        sort_field = self.strip_html(front)
+        checksum = int(hashlib.sha1(sort_field.encode('utf-8')).hexdigest()[:8], 16)
+        # GUID由正面内容决定，重复导入同一张卡片时Anki会识别为同一笔记
+        guid = hashlib.sha1(f"{self.deck_name}\x1f{front}".encode('utf-8')).hexdigest()[:16]
+        tag_text = f" {' '.join(tag.replace(' ', '_') for tag in tags)} " if tags else ""
+
+        self.conn.execute(
+            "INSERT INTO notes VALUES (?, ?, ?, ?, -1, ?, ?, ?, ?, 0, '')",
+            (note_id, guid, MODEL_ID, self.now, tag_text, f"{front}\x1f{back}", sort_field, checksum)
+        )
+        self.conn.execute(
+            "INSERT INTO cards VALUES (?, ?, ?, 0, ?, -1, 0, 0, ?, 0, 0, 0, 0, 0, 0, 0, 0, '')",
+            (note_id, note_id, self.deck_id, self.now, self.count)
+        )
+
+    def close(self):
+        """提交并打包为.apkg，返回写入的卡片数量"""
+        try:
+            self.conn.commit()
+        finally:
+            self.conn.close()
+
+        try:
+            with zipfile.ZipFile(self.filename, 'w', zipfile.ZIP_DEFLATED) as package:
+                package.write(self.collection_path, "collection.anki2")
+                package.writestr("media", "{}")
+        finally:
+            os.remove(self.collection_path)
+
+        return self.count
+
+    def abort(self):
+        """放弃写入，删除临时文件"""
+        self.conn.close()
+        if os.path.exists(self.collection_path):
+            os.remove(self.collection_path)
+
+    def _write_collection(self, conn, now):
+        """写入集合配置、笔记类型和牌组"""
+        conf = {
+            'activeDecks': [1], 'curDeck': 1, 'newSpread': 0, 'collapseTime': 1200,
+            'timeLim': 0, 'estTimes': True, 'dueCounts': True, 'curModel': None,
+            'nextPos': 1, 'sortType': 'noteFld', 'sortBackwards': False, 'addToCur': True
+        }
+        models = {str(MODEL_ID): self._build_model(now)}
+        decks = {
+            '1': self._build_deck(1, "Default", now),
+            str(self.deck_id): self._build_deck(self.deck_id, self.deck_name, now)
+        }
+        dconf = {
+            '1': {
+                'id': 1, 'name': 'Default', 'mod': 0, 'usn': 0, 'maxTaken': 60,
+                'autoplay': True, 'replayq': True, 'timer': 0,
+                'new': {'bury': True, 'delays': [1, 10], 'initialFactor': 2500,
+                        'ints': [1, 4, 7], 'order': 1, 'perDay': 20, 'separate': True},
+                'rev': {'bury': True, 'ease4': 1.3, 'fuzz': 0.05, 'ivlFct': 1,
+                        'maxIvl': 36500, 'minSpace': 1, 'perDay': 100},
+                'lapse': {'delays': [10], 'leechAction': 0, 'leechFails': 8,
+                          'minInt': 1, 'mult': 0}
+            }
+        }
+        conn.execute(
+            "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+            (now - now % 86400, now * 1000, now * 1000,
+             json.dumps(conf), json.dumps(models, ensure_ascii=False),
+             json.dumps(decks, ensure_ascii=False), json.dumps(dconf))
+        )
+
+    def _build_model(self, now):
+        """正面/背面两个字段的基础笔记类型"""
+        fields = [
+            {'name': name, 'ord': index, 'font': 'Arial', 'size': 20,
+             'media': [], 'rtl': False, 'sticky': False}
+            for index, name in enumerate(["Front", "Back"])
+        ]
+        return {
+            'id': MODEL_ID, 'name': self.model_name, 'type': 0, 'mod': now, 'usn': -1,
+            'sortf': 0, 'did': self.deck_id, 'tags': [], 'vers': [],
+            'flds': fields,
+            'tmpls': [{
+                'name': 'Card 1', 'ord': 0, 'did': None, 'bqfmt': '', 'bafmt': '',
+                'qfmt': '{{Front}}',
+                'afmt': '{{FrontSide}}\n\n<hr id=answer>\n\n{{Back}}'
+            }],
+            'req': [[0, 'all', [0]]],
+            'css': CARD_CSS,
+            'latexPre': "\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n"
+                        "\\usepackage[utf8]{inputenc}\n\\usepackage{amssymb,amsmath}\n"
+                        "\\pagestyle{empty}\n\\setlength{\\parindent}{0in}\n\\begin{document}\n",
+            'latexPost': "\\end{document}"
+        }
+
+    def _build_deck(self, deck_id, name, now):
+        """牌组定义"""
+        return {
+            'id': deck_id, 'name': name, 'desc': '', 'mod': now, 'usn': -1,
+            'conf': 1, 'dyn': 0, 'collapsed': False, 'extendNew': 10, 'extendRev': 50,
+            'newToday': [0, 0], 'revToday': [0, 0], 'lrnToday': [0, 0], 'timeToday': [0, 0]
+        }
+
+    @staticmethod
+    def strip_html(text):
+        """去除HTML标签（用于排序字段和重复检测校验和）"""
+        return HTML_TAG_PATTERN.sub('', text).strip()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+智能分类翻译器 - 无界面批处理模式
+从文件或标准输入逐行读取单词/句子，并发查询后按完成顺序输出 JSONL 或 Anki TSV
+
+用法:
+    python3 batch_translate.py words.txt
+    python3 batch_translate.py --format tsv --concurrency 8 < highlights.txt > cards.txt
+    python3 batch_translate.py words.txt --tsv-output cards.txt > results.jsonl
+"""
+
+import argparse
+import json
+import sys
+from contextlib import redirect_stdout
+
+from 智能分类翻译器 import SmartTranslator
+
+
+def read_lines(stream):
+    """逐行读取输入，跳过空行"""
+    for line in stream:
+        text = line.strip()
+        if text:
+            yield text
+
+
+def format_tsv_line(translator, card):
+    """将卡片数据格式化为Anki TSV行（正面\\t背面\\t标签）"""
+    front, back = translator.format_anki_card(card)
+    return translator.format_anki_tsv_line(front, back, ["智能翻译"])
+
+
+def run_batch(translator, lines, output, output_format="jsonl", concurrency=4, tsv_output=None):
+    """批量处理输入并流式输出，返回 (成功数, 失败数)"""
+    success_count = 0
+    fail_count = 0
+
+    for index, outcome, error in translator.engine.process_stream(lines, concurrency):
+        card = outcome['card'] if outcome else None
+
+        if output_format == "jsonl":
+            record = {
+                'index': index,
+                'input': outcome['input'] if outcome else None,
+                'category': outcome['category'] if outcome else None,
+                'result': outcome['result'] if outcome else None,
+                'card': card,
+                'error': str(error) if error else (None if card else "处理失败")
+            }
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif card:
+            output.write(format_tsv_line(translator, card))
+        output.flush()
+
+        if card:
+            success_count += 1
+            if tsv_output is not None:
+                tsv_output.write(format_tsv_line(translator, card))
+                tsv_output.flush()
+        else:
+            fail_count += 1
+
+    return success_count, fail_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="智能分类翻译器 - 无界面批处理模式")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="输入文件（每行一个单词或句子），默认读取标准输入")
+    parser.add_argument("--format", choices=["jsonl", "tsv"], default="jsonl",
+                        help="标准输出格式：jsonl（完整结果）或 tsv（Anki导入格式）")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="同时处理的条目数（默认4），查询引擎按此数量创建工作线程")
+    parser.add_argument("--tsv-output", help="同时将Anki TSV写入该文件")
+    args = parser.parse_args(argv)
+
+    # 结果写入真实的标准输出；翻译过程中的日志转到标准错误，避免污染输出流
+    output = sys.stdout
+    input_stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    tsv_output = open(args.tsv_output, "w", encoding="utf-8") if args.tsv_output else None
+
+    # 每个在途条目占用一个引擎工作线程，线程数与并发数一致才不会被默认的8个线程限制
+    concurrency = max(1, args.concurrency)
+
+    try:
+        with redirect_stdout(sys.stderr):
+            translator = SmartTranslator(headless=True, lookup_workers=concurrency)
+            try:
+                success_count, fail_count = run_batch(
+                    translator, read_lines(input_stream), output,
+                    args.format, concurrency, tsv_output)
+            finally:
+                translator.engine.shutdown()
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if tsv_output is not None:
+            tsv_output.close()
+
+    print(f"✅ 批处理完成: 成功 {success_count} 条, 失败 {fail_count} 条", file=sys.stderr)
+    return 0 if fail_count == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
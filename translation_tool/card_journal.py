@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词卡会话日志模块
+每次添加/删除/清空卡片都追加一行 JSON 到日志文件，启动时重放恢复词卡列表；
+日志中的失效记录过多时压缩为当前词卡的快照
+"""
+
+import json
+import os
+import threading
+
+# 日志操作
+OP_ADD = "add"
+OP_REMOVE = "remove"
+OP_CLEAR = "clear"
+
+
+class CardJournal:
+    def __init__(self, path, compact_min_records=200):
+        self.path = str(path)
+        # 记录数至少达到该值且超过存活卡片数两倍时才压缩
+        self.compact_min_records = compact_min_records
+        self.record_count = 0
+        # 日志中存在损坏的行时，下次检查压缩时重写日志
+        self.corrupted = False
+        self.lock = threading.Lock()
+        self.file = None
+
+    def replay(self, store):
+        """按顺序重放日志到词卡存储，返回恢复的卡片数量"""
+        if not os.path.exists(self.path):
+            return 0
+
+        record_count = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 程序崩溃时最后一行可能只写了一半，跳过即可
+                    print(f"⚠️ 词卡日志第 {line_number} 行已损坏，已跳过")
+                    self.corrupted = True
+                    continue
+
+                record_count += 1
+                op = record.get('op')
+                if op == OP_ADD:
+                    store.add(record['card'])
+                elif op == OP_REMOVE:
+                    store.remove(record['input'])
+                elif op == OP_CLEAR:
+                    store.clear()
+
+        self.record_count = record_count
+        return len(store)
+
+    def append_add(self, card):
+        """记录添加卡片"""
+        self._append({'op': OP_ADD, 'card': card})
+
+    def append_remove(self, input_text):
+        """记录删除卡片"""
+        self._append({'op': OP_REMOVE, 'input': input_text})
+
+    def append_clear(self):
+        """记录清空卡片"""
+        self._append({'op': OP_CLEAR})
+
+    def _append(self, record):
+        """追加一条记录并立即落盘"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, 'a', encoding='utf-8')
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.record_count += 1
+
+    def maybe_compact(self, store):
+        """失效记录过多时压缩日志，返回是否进行了压缩"""
+        if not self.corrupted and (self.record_count < self.compact_min_records
+                                   or self.record_count <= len(store) * 2):
+            return False
+        self.compact(store)
+        return True
+
+    def compact(self, store):
+        """将当前词卡写成快照，原子替换日志文件"""
+        temp_path = self.path + ".tmp"
+        with self.lock:
+            cards = list(store)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for card in cards:
+                    f.write(json.dumps({'op': OP_ADD, 'card': card}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            os.replace(temp_path, self.path)
+            self.record_count = len(cards)
+            self.corrupted = False
+
+    def close(self):
+        """关闭日志文件"""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词卡存储模块
+按规范化输入建立哈希索引，O(1) 判重；保留插入顺序，并按类型和创建时间建立二级索引；
+同时保存每张卡片的渲染结果，随卡片删除/清空一并丢弃
+"""
+
+import bisect
+import re
+import threading
+
+
+class CardStore:
+    def __init__(self, cards=None):
+        self.cards = {}
+        self.type_index = {}
+        self.time_index = []
+        self.sequence = 0
+        # 键 → (字段快照, 模板版本, 渲染结果)
+        self.rendered = {}
+        self.render_hits = 0
+        self.render_misses = 0
+        self.lock = threading.RLock()
+        for card in cards or []:
+            self.add(card)
+
+    @staticmethod
+    def normalize_key(text):
+        """规范化输入文本：去除首尾空白、合并空白、忽略大小写"""
+        return re.sub(r'\s+', ' ', text.strip()).lower()
+
+    def add(self, card):
+        """添加卡片，输入重复时返回False"""
+        key = self.normalize_key(card['input'])
+        with self.lock:
+            if key in self.cards:
+                return False
+
+            self.cards[key] = card
+            self.type_index.setdefault(card.get('type', ''), {})[key] = card
+            self.sequence += 1
+            bisect.insort(self.time_index, (card.get('created_time', ''), self.sequence, key))
+            return True
+
+    def contains(self, text):
+        """检查输入是否已存在"""
+        return self.normalize_key(text) in self.cards
+
+    def get(self, text):
+        """按输入查找卡片"""
+        return self.cards.get(self.normalize_key(text))
+
+    def remove(self, text):
+        """删除卡片，不存在时返回None"""
+        key = self.normalize_key(text)
+        with self.lock:
+            card = self.cards.pop(key, None)
+            if card is None:
+                return None
+
+            self.type_index.get(card.get('type', ''), {}).pop(key, None)
+            self.time_index = [entry for entry in self.time_index if entry[2] != key]
+            self.rendered.pop(key, None)
+            return card
+
+    def clear(self):
+        """清空所有卡片"""
+        with self.lock:
+            self.cards.clear()
+            self.type_index.clear()
+            self.time_index = []
+            self.rendered.clear()
+
+    def get_rendered(self, card, template_version):
+        """读取卡片的渲染结果；卡片不在存储中、字段已修改或模板版本不同时返回None"""
+        key = self.normalize_key(card['input'])
+        with self.lock:
+            if self.cards.get(key) is not card:
+                return None
+            entry = self.rendered.get(key)
+            if entry is not None:
+                snapshot, version, rendered = entry
+                if version == template_version and snapshot == card:
+                    self.render_hits += 1
+                    return rendered
+            self.render_misses += 1
+            return None
+
+    def set_rendered(self, card, template_version, rendered):
+        """保存卡片的渲染结果（仅保存存储中的卡片）"""
+        key = self.normalize_key(card['input'])
+        with self.lock:
+            if self.cards.get(key) is card:
+                self.rendered[key] = (dict(card), template_version, rendered)
+
+    def get_render_stats(self):
+        """获取渲染结果复用统计"""
+        with self.lock:
+            total = self.render_hits + self.render_misses
+            return {
+                'size': len(self.rendered),
+                'hits': self.render_hits,
+                'misses': self.render_misses,
+                'hit_rate': self.render_hits / total if total else 0.0
+            }
+
+    def by_type(self, card_type):
+        """按类型列出卡片（保持插入顺序）"""
+        return list(self.type_index.get(card_type, {}).values())
+
+    def count_by_type(self, card_type):
+        """统计某类型的卡片数量"""
+        return len(self.type_index.get(card_type, {}))
+
+    def by_created_time(self, start=None, end=None):
+        """列出创建时间在 [start, end] 之间的卡片（时间格式 %Y-%m-%d %H:%M:%S）"""
+        with self.lock:
+            low = 0 if start is None else bisect.bisect_left(self.time_index, (start,))
+            high = len(self.time_index) if end is None else bisect.bisect_right(self.time_index, (end, float('inf')))
+            keys = [entry[2] for entry in self.time_index[low:high]]
+        return [self.cards[key] for key in keys if key in self.cards]
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(list(self.cards.values()))
+
+    def __contains__(self, text):
+        return self.contains(text)
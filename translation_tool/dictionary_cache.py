@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词典查询缓存模块
+基于 dictionaries/dictionary.db 的持久化查询缓存（读穿透 + 写回）
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+DEFAULT_DB_PATH = Path(__file__).parent / "dictionaries" / "dictionary.db"
+
+
+class DictionaryCache:
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conn = None
+        self._connect()
+
+    def _connect(self):
+        """打开数据库连接并确保表结构存在"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS dictionary (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    word TEXT UNIQUE NOT NULL,
+                    phonetic TEXT,
+                    translation TEXT,
+                    definition TEXT,
+                    example TEXT,
+                    part_of_speech TEXT,
+                    frequency INTEGER DEFAULT 0,
+                    source TEXT,
+                    created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_word ON dictionary(word)")
+            self.conn.commit()
+        except Exception as e:
+            print(f"⚠️ 词典缓存数据库打开失败: {e}")
+            self.conn = None
+
+    def get(self, word):
+        """查询缓存，命中时返回与在线词典相同结构的结果"""
+        if self.conn is None:
+            return None
+
+        key = word.strip().lower()
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT word, phonetic, translation, definition, example, part_of_speech "
+                    "FROM dictionary WHERE word = ?",
+                    (key,)
+                ).fetchone()
+        except Exception as e:
+            print(f"⚠️ 词典缓存读取失败: {e}")
+            return None
+
+        if not row:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        _, phonetic, translation, definition, example, part_of_speech = row
+        return {
+            'type': 'dictionary',
+            'word': word,
+            'phonetic': phonetic or '',
+            'definitions': self._load_definitions(definition, translation, part_of_speech),
+            'examples': self._load_examples(example)
+        }
+
+    def put(self, word, result, source=''):
+        """写回一条在线查询成功的词典结果"""
+        if self.conn is None or not result or result.get('type') != 'dictionary':
+            return False
+
+        definitions = result.get('definitions', [])
+        examples = result.get('examples', [])
+        if not definitions:
+            return False
+
+        first = definitions[0]
+        try:
+            with self.lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO dictionary "
+                    "(word, phonetic, translation, definition, example, part_of_speech, source) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        word.strip().lower(),
+                        result.get('phonetic', ''),
+                        first.get('def', ''),
+                        json.dumps(definitions, ensure_ascii=False),
+                        json.dumps(examples, ensure_ascii=False),
+                        first.get('pos', ''),
+                        source
+                    )
+                )
+                self.conn.commit()
+            return True
+        except Exception as e:
+            print(f"⚠️ 词典缓存写入失败: {e}")
+            return False
+
+    def _load_definitions(self, definition, translation, part_of_speech):
+        """解析释义字段，兼容数据库中已有的纯文本记录"""
+        if definition:
+            try:
+                data = json.loads(definition)
+                if isinstance(data, list):
+                    return data
+            except ValueError:
+                pass
+            return [{'pos': '', 'def': definition}]
+        if translation:
+            return [{'pos': part_of_speech or '', 'def': translation}]
+        return []
+
+    def _load_examples(self, example):
+        """解析例句字段，兼容数据库中已有的纯文本记录"""
+        if not example:
+            return []
+        try:
+            data = json.loads(example)
+            if isinstance(data, list):
+                return data
+        except ValueError:
+            pass
+        return [example]
+
+    def get_stats(self):
+        """获取缓存命中统计"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        """关闭数据库连接"""
+        if self.conn is not None:
+            with self.lock:
+                self.conn.close()
+            self.conn = None
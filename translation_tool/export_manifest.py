@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出清单模块
+记录每张已导出卡片的内容哈希，增量导出时只写出新增或内容变化的卡片
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+
+class ExportManifest:
+    def __init__(self, path):
+        self.path = str(path)
+        # 卡片键 → 已导出内容的哈希
+        self.hashes = {}
+        self.last_export = None
+        self.load()
+
+    def load(self):
+        """读取清单文件，不存在或损坏时视为从未导出"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.hashes = data.get('cards', {})
+            self.last_export = data.get('last_export')
+        except Exception as e:
+            print(f"⚠️ 导出清单读取失败，将重新导出全部卡片: {e}")
+            self.hashes = {}
+
+    @staticmethod
+    def digest(front, back, tags):
+        """计算卡片导出内容的哈希（正面、背面和标签任一变化都会改变哈希）"""
+        content = "\x1f".join([front, back, " ".join(tags)])
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def is_changed(self, key, digest):
+        """卡片是新增的或内容与上次导出不同"""
+        return self.hashes.get(key) != digest
+
+    def mark(self, key, digest):
+        """记录卡片已按该内容导出"""
+        self.hashes[key] = digest
+
+    def save(self):
+        """原子写入清单文件"""
+        self.last_export = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'last_export': self.last_export, 'cards': self.hashes}, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+待导入卡片日志模块
+无法导入Anki的卡片追加写入按大小/时间轮转的TSV分段文件，而不是每张卡片生成两个文件；
+所有卡片记录在同一个索引文件中，每个分段只有一份导入说明
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# 分段文件名前缀和时间格式
+SEGMENT_PREFIX = "待导入卡片_"
+SEGMENT_TIME_FORMAT = "%Y%m%d_%H%M%S"
+INDEX_FILENAME = "卡片索引.jsonl"
+
+# Anki 2.1.54+ 识别的TSV文件头
+TSV_HEADER = "#separator:tab\n#html:true\n#tags column:3\n"
+
+
+class FallbackJournal:
+    def __init__(self, folder, max_bytes=1024 * 1024, max_age=7 * 24 * 3600, deck_name="阅读中的收获"):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.deck_name = deck_name
+        self.index_path = self.folder / INDEX_FILENAME
+        self.lock = threading.Lock()
+
+        # 当前分段：继续使用上次未轮转的分段
+        self.segment_path = None
+        self.segment_started = None
+        self.segment_cards = 0
+        self._resume_segment()
+
+    def _resume_segment(self):
+        """找到最新的分段文件并统计其中的卡片数"""
+        segments = sorted(self.folder.glob(f"{SEGMENT_PREFIX}*.txt"))
+        segments = [path for path in segments if not path.stem.endswith("_导入说明")]
+        if not segments:
+            return
+
+        path = segments[-1]
+        try:
+            timestamp = path.stem[len(SEGMENT_PREFIX):len(SEGMENT_PREFIX) + len("YYYYmmdd_HHMMSS")]
+            started = datetime.strptime(timestamp, SEGMENT_TIME_FORMAT)
+        except ValueError:
+            return
+
+        with open(path, 'r', encoding='utf-8') as f:
+            cards = sum(1 for line in f if line.strip() and not line.startswith('#'))
+        self.segment_path = path
+        self.segment_started = started
+        self.segment_cards = cards
+
+    def append(self, line, word="", card_type=""):
+        """追加一行Anki TSV卡片，返回所在的分段文件"""
+        with self.lock:
+            if self._should_rotate(len(line.encode('utf-8'))):
+                self._rotate()
+
+            with open(self.segment_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self.segment_cards += 1
+
+            record = {
+                'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'word': word,
+                'type': card_type,
+                'segment': self.segment_path.name,
+                'position': self.segment_cards
+            }
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            return self.segment_path
+
+    def _should_rotate(self, line_size):
+        """当前分段不存在、超过大小或时间限制时需要轮转"""
+        if self.segment_path is None or not self.segment_path.exists():
+            return True
+        if self.segment_cards and os.path.getsize(self.segment_path) + line_size > self.max_bytes:
+            return True
+        return (datetime.now() - self.segment_started).total_seconds() > self.max_age
+
+    def _rotate(self):
+        """开始新的分段文件，并为其写入一份导入说明"""
+        started = datetime.now()
+        path = self.folder / f"{SEGMENT_PREFIX}{started.strftime(SEGMENT_TIME_FORMAT)}.txt"
+        # 同一秒内轮转时避免覆盖
+        suffix = 1
+        while path.exists():
+            path = self.folder / f"{SEGMENT_PREFIX}{started.strftime(SEGMENT_TIME_FORMAT)}_{suffix}.txt"
+            suffix += 1
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(TSV_HEADER)
+        self.segment_path = path
+        self.segment_started = started
+        self.segment_cards = 0
+        self._write_instructions(path)
+        print(f"📄 新的待导入卡片文件: {path.name}")
+
+    def _write_instructions(self, segment_path):
+        """写入分段的导入说明"""
+        instruction_file = segment_path.parent / f"{segment_path.stem}_导入说明.txt"
+        instructions = f"""🧠 智能分类翻译器 - 待导入卡片说明
+
+文件: {segment_path.name}
+创建时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+这些卡片未能通过AnkiConnect自动导入Anki，已追加保存到上面的文件中。
+同一文件会持续追加卡片，直到超过大小或时间限制后换用新文件；
+所有卡片的单词、类型、所在文件和在文件中的序号记录在 {INDEX_FILENAME} 中。
+
+🚀 导入步骤:
+1. 打开Anki软件
+2. 点击"导入文件"或使用快捷键 Ctrl+Shift+I (Mac: Cmd+Shift+I)
+3. 选择文件: {segment_path.name}
+4. 设置导入选项（Anki 2.1.54+ 会根据文件头自动设置）:
+   - 字段分隔符: 制表符 (Tab)
+   - 允许HTML: 是
+   - 字段映射: 字段1→正面, 字段2→背面, 字段3→标签
+5. 选择目标牌组 "{self.deck_name}"
+6. 点击"导入"完成
+
+💡 使用建议:
+- 重复导入同一文件时选择"更新已有笔记"，避免重复卡片
+- 导入后可以删除该文件及本说明
+
+祝学习愉快！🎉
+"""
+        try:
+            with open(instruction_file, 'w', encoding='utf-8') as f:
+                f.write(instructions)
+        except Exception as e:
+            print(f"❌ 创建导入说明失败: {e}")
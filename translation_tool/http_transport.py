@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 传输层模块
+统一创建带连接池、长连接和重试策略的 requests.Session，供所有接口共享
+"""
+
+import random
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+# 只对幂等请求按状态码重试；连接失败（请求尚未发出）对所有方法都会重试
+RETRY_METHODS = frozenset(['GET', 'HEAD'])
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class JitteredRetry(Retry):
+    """带随机抖动的指数退避重试策略，避免并发请求同时重试"""
+
+    jitter = 0.3
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, self.jitter)
+
+
+def create_retry(retries=2, backoff_factor=0.3):
+    """创建重试策略：指数退避 + 抖动，不等待服务器的Retry-After以保证延迟可控
+
+    只重试连接错误和429/5xx状态码；读取超时直接抛出 requests.exceptions.Timeout，
+    由调用方记录到延迟统计（重试会让自适应超时只看到快速成功的样本，并成倍放大慢请求的耗时）
+    """
+    return JitteredRetry(
+        total=retries,
+        connect=retries,
+        read=False,
+        status=retries,
+        allowed_methods=RETRY_METHODS,
+        status_forcelist=RETRY_STATUS_CODES,
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+
+
+def create_session(pool_connections=10, pool_maxsize=10, retries=2, backoff_factor=0.3, headers=None):
+    """创建共享会话
+
+    pool_connections为缓存的主机连接池数量，pool_maxsize为每个主机保持的长连接数。
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=create_retry(retries, backoff_factor)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': DEFAULT_USER_AGENT,
+        'Connection': 'keep-alive'
+    })
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_connection_stats(session):
+    """统计会话中各主机的连接复用情况"""
+    stats = {}
+    seen_adapters = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen_adapters or not hasattr(adapter, 'poolmanager'):
+            continue
+        seen_adapters.add(id(adapter))
+
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            requests_count = getattr(pool, 'num_requests', 0)
+            connections_count = getattr(pool, 'num_connections', 0)
+            stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'requests': requests_count,
+                'connections': connections_count,
+                'reused': max(0, requests_count - connections_count)
+            }
+    return stats
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+接口延迟统计模块
+按接口记录滚动窗口内的响应耗时，并根据 p95/p99 推算自适应超时时间
+"""
+
+import math
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    def __init__(self, window_size=200, min_samples=10, multiplier=1.5):
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.samples = {}
+        self.timeouts = {}
+        self.limits = {}
+        self.lock = threading.Lock()
+
+    def configure(self, endpoint, default, floor, ceiling):
+        """设置接口的默认超时及上下限（秒）"""
+        with self.lock:
+            self.limits[endpoint] = (default, floor, ceiling)
+
+    def record(self, endpoint, elapsed, timed_out=False):
+        """记录一次请求耗时；超时按当时的超时时间计入，使慢网络下超时逐步放宽"""
+        with self.lock:
+            if endpoint not in self.samples:
+                self.samples[endpoint] = deque(maxlen=self.window_size)
+                self.timeouts[endpoint] = 0
+            self.samples[endpoint].append(elapsed)
+            if timed_out:
+                self.timeouts[endpoint] += 1
+
+    def get_percentile(self, endpoint, percentile):
+        """计算滚动窗口内的延迟分位数，样本为空时返回None"""
+        with self.lock:
+            samples = sorted(self.samples.get(endpoint, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(percentile / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def get_timeout(self, endpoint, default=None):
+        """根据观测到的p99推算超时时间，样本不足时使用默认值"""
+        with self.lock:
+            configured_default, floor, ceiling = self.limits.get(endpoint, (default, None, None))
+            sample_count = len(self.samples.get(endpoint, ()))
+        if default is None:
+            default = configured_default
+
+        if sample_count < self.min_samples:
+            return default
+
+        timeout = self.get_percentile(endpoint, 99) * self.multiplier
+        if floor is not None:
+            timeout = max(timeout, floor)
+        if ceiling is not None:
+            timeout = min(timeout, ceiling)
+        return timeout
+
+    def get_stats(self):
+        """获取各接口的延迟统计"""
+        with self.lock:
+            endpoints = list(self.samples)
+        stats = {}
+        for endpoint in endpoints:
+            with self.lock:
+                count = len(self.samples[endpoint])
+                timeouts = self.timeouts[endpoint]
+            stats[endpoint] = {
+                'count': count,
+                'timeouts': timeouts,
+                'p50': self.get_percentile(endpoint, 50),
+                'p95': self.get_percentile(endpoint, 95),
+                'p99': self.get_percentile(endpoint, 99),
+                'timeout': self.get_timeout(endpoint)
+            }
+        return stats
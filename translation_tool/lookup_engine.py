@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步查询引擎模块
+在单个后台 asyncio 事件循环中执行：分类 → 词典查询/翻译 → 卡片数据构建
+界面、批处理和服务模式都通过同一个引擎提交查询
+
+查询流程由协程编排，每个词典接口请求、每组批量翻译请求和缓存读写都是单独的线程池任务，
+查询只在这些阻塞调用进行期间占用线程；取消查询后不会再启动后续的接口请求和翻译。
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from single_flight import SingleFlight
+
+# 需要翻译（而不是词典查询）的分类
+TRANSLATION_CATEGORIES = ("english_phrase", "english_sentence", "chinese_word", "chinese_sentence")
+
+
+class LookupEngine:
+    def __init__(self, translator, max_workers=8):
+        self.translator = translator
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lookup-engine")
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        # 合并相同的并发查询（同一单词的词典查询、同一文本和语言对的翻译只执行一次）
+        self.inflight_lookups = SingleFlight()
+        self.thread = threading.Thread(target=self._run_loop, name="lookup-engine-loop", daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        """后台线程：运行事件循环"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def run_blocking(self, func, *args, executor=None):
+        """在线程池中执行一次阻塞调用（默认为引擎线程池）
+
+        查询被取消时，尚未开始执行的调用不会再执行。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, func, *args)
+
+    async def process(self, text, category=None, info=None):
+        """完整处理流程：分类 → 查询/翻译 → 构建卡片数据"""
+        text = text.strip()
+        if category is None:
+            category, info = self.translator.classify_input(text)
+
+        result = await self.lookup(text, category)
+
+        card = None
+        if result:
+            card = self.translator.create_anki_card_data(text, category, result)
+
+        return {
+            'input': text,
+            'category': category,
+            'info': info,
+            'result': result,
+            'card': card
+        }
+
+    async def lookup(self, text, category):
+        """根据分类执行词典查询或翻译"""
+        if category == "english_word":
+            # 英文单词 → 词典查询
+            return await self.dictionary_lookup(text)
+        if category in TRANSLATION_CATEGORIES:
+            # 英文短语/句子 → 英译中；中文内容 → 中译英
+            source_lang, target_lang = self.translator.get_langpair(category)
+            return await self.translate_text(text, source_lang, target_lang)
+        return None
+
+    async def dictionary_lookup(self, word):
+        """词典查询，相同单词的并发查询共享一次结果（与词典缓存一样不区分大小写）"""
+        key = ('dictionary', word.strip().lower())
+        return await self.inflight_lookups.do(key, self._dictionary_lookup, word)
+
+    async def _dictionary_lookup(self, word):
+        """词典查询：本地词典 → 词典缓存 → 在线词典 → 翻译兜底"""
+        translator = self.translator
+        local_result = translator.get_local_dictionary(word)
+        if local_result and local_result.get('found'):
+            return local_result
+
+        cached_result = await self.run_blocking(translator.dictionary_cache.get, word)
+        if cached_result:
+            print(f"⚡ 词典缓存命中: {word}")
+            return cached_result
+
+        online_result = await self.get_online_dictionary(word)
+        if online_result:
+            # 写回缓存，下次查询无需联网；翻译不完整的结果（MyMemory限流、熔断等）不缓存，下次重新查询
+            if online_result.get('translated'):
+                await self.run_blocking(translator.dictionary_cache.put, word, online_result,
+                                        online_result.get('source', ''))
+            else:
+                print(f"⚠️ 释义或例句未完整翻译，不写入词典缓存: {word}")
+            return online_result
+
+        # 如果词典查询失败，尝试翻译
+        translation_result = await self.translate_text(word, "en", "zh")
+        if translation_result:
+            return {
+                'type': 'translation_fallback',
+                'word': word,
+                'translation': translation_result.get('translation', ''),
+                'phonetic': '',
+                'definitions': [],
+                'examples': []
+            }
+
+        return None
+
+    async def get_online_dictionary(self, word):
+        """多接口在线词典查询，先返回的有效结果胜出
+
+        sequential模式依次查询；parallel模式同时启动全部接口；hedged模式先启动最高优先级接口，
+        超过对冲延迟仍未返回（或已失败）再启动下一个。多个结果同时就绪时按优先级取。
+        各接口只获取英文原始词条，只有胜出的词条才调用MyMemory翻译；
+        有结果后（或查询被取消时）取消尚未开始的接口请求，不再启动其余接口。
+        """
+        translator = self.translator
+        apis = translator.dictionary_providers
+        mode = translator.dictionary_query_mode
+        if mode == "parallel":
+            hedge_delay = 0
+        elif mode == "hedged":
+            hedge_delay = translator.dictionary_hedge_delay
+        else:
+            hedge_delay = None
+
+        pending = {}
+        next_index = 0
+        try:
+            while next_index < len(apis) or pending:
+                # 没有进行中的查询，或无需对冲等待时，立即启动下一个接口
+                if next_index < len(apis) and (not pending or hedge_delay == 0):
+                    pending[self._start_provider(apis[next_index], word)] = next_index
+                    next_index += 1
+                    continue
+
+                timeout = hedge_delay if next_index < len(apis) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # 对冲延迟已到，启动下一个接口
+                    pending[self._start_provider(apis[next_index], word)] = next_index
+                    next_index += 1
+                    continue
+
+                results = {}
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                        if result:
+                            results[index] = result
+                    except Exception as e:
+                        print(f"❌ {apis[index].__name__} 查询失败: {e}")
+
+                if results:
+                    best_index = min(results)
+                    print(f"✅ 词典查询成功: {apis[best_index].__name__}")
+                    for future in pending:
+                        future.cancel()
+                    pending = {}
+                    result = await self.translate_dictionary_entry(results[best_index])
+                    result['source'] = apis[best_index].__name__
+                    return result
+        finally:
+            for future in pending:
+                future.cancel()
+
+        print(f"❌ 所有词典API查询失败: {word}")
+        return None
+
+    def _start_provider(self, api_func, word):
+        """在词典线程池中启动一个接口请求（经熔断器）"""
+        translator = self.translator
+        return self.loop.run_in_executor(translator.dictionary_executor,
+                                         translator.call_dictionary_provider, api_func, word)
+
+    async def translate_dictionary_entry(self, entry):
+        """翻译原始词条的释义和例句，生成最终的词典结果"""
+        definitions, examples, translated = await self.translate_entry_parts(
+            entry['def_items'], entry['example_texts'])
+        return {
+            'type': 'dictionary',
+            'word': entry['word'],
+            'phonetic': entry['phonetic'],
+            'definitions': definitions,
+            'examples': examples,
+            'translated': translated
+        }
+
+    async def translate_entry_parts(self, def_items, example_texts):
+        """批量翻译释义和例句，按原顺序组装结果
+
+        def_items为(词性, 英文释义)列表，example_texts为英文例句列表。
+        返回 (释义, 例句, 是否全部翻译成功)；翻译失败的部分保留英文原文。
+        """
+        texts = [def_text for _, def_text in def_items] + list(example_texts)
+        translations = await self.translate_batch(texts, 'en', 'zh')
+        def_translations = translations[:len(def_items)]
+        example_translations = translations[len(def_items):]
+
+        definitions = []
+        for (pos, def_text), chinese_def in zip(def_items, def_translations):
+            definitions.append({'pos': pos, 'def': chinese_def if chinese_def else def_text})
+
+        examples = []
+        for example, chinese_example in zip(example_texts, example_translations):
+            examples.append(f"{example} ({chinese_example})" if chinese_example else example)
+
+        translated = all(translations)
+        return definitions, examples, translated
+
+    async def translate_batch(self, texts, source_lang, target_lang):
+        """批量翻译多个短文本
+
+        缓存未命中的片段按查询长度上限打包成尽量少的MyMemory请求，
+        各请求在翻译线程池中并发发送。返回与texts等长的列表，失败位置为None。
+        """
+        translator = self.translator
+        results = [None] * len(texts)
+        pending = {}
+
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            cached = translator.translation_cache.get(text, source_lang, target_lang)
+            if cached is not None:
+                results[i] = cached
+            else:
+                # 相同片段只翻译一次
+                pending.setdefault(text, []).append(i)
+
+        if not pending:
+            return results
+
+        chunks = translator._pack_batch_segments(list(pending))
+        chunk_translations = await asyncio.gather(*(
+            self.run_blocking(translator._translate_batch_chunk, chunk, source_lang, target_lang,
+                              executor=translator.translation_executor)
+            for chunk in chunks))
+
+        for chunk, translations in zip(chunks, chunk_translations):
+            for segment, translation in zip(chunk, translations):
+                for i in pending[segment]:
+                    results[i] = translation
+
+        return results
+
+    async def translate_text(self, text, source_lang, target_lang):
+        """文本翻译，相同的并发翻译共享一次结果
+
+        与翻译缓存使用相同的键：只合并空白、保留大小写（"May"和"may"的译文不同）。
+        """
+        key = ('translation',) + self.translator.translation_cache.make_key(text, source_lang, target_lang)
+        return await self.inflight_lookups.do(key, self._translate_text, text, source_lang, target_lang)
+
+    async def _translate_text(self, text, source_lang, target_lang):
+        """文本翻译：MyMemory → 备用翻译"""
+        translator = self.translator
+        translation = await self.run_blocking(translator.translate_with_mymemory, text, source_lang, target_lang)
+        if not translation:
+            translation = translator.translate_with_fallback(text, source_lang, target_lang)
+
+        if translation:
+            return {
+                'type': 'translation',
+                'original': text,
+                'translation': translation,
+                'source_lang': source_lang,
+                'target_lang': target_lang
+            }
+
+        return None
+
+    def run(self, coro):
+        """从其他线程执行协程并等待结果（供同步接口使用，不能在事件循环线程中调用）"""
+        if threading.current_thread() is self.thread:
+            coro.close()
+            raise RuntimeError("不能在查询引擎的事件循环线程中同步等待")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def submit(self, text, category=None, info=None):
+        """从任意线程提交查询，返回concurrent.futures.Future
+
+        调用future.cancel()会取消引擎中的协程：尚未开始的接口请求和翻译不再执行，
+        结果不会再被使用。
+        """
+        return asyncio.run_coroutine_threadsafe(self.process(text, category, info), self.loop)
+
+    def process_stream(self, texts, concurrency=4):
+        """并发处理多个输入，按完成顺序逐个产出 (序号, 结果, 异常)
+
+        texts可以是任意迭代器（如逐行读取的文件），同时在途的查询不超过concurrency个。
+        """
+        in_flight = {}
+        text_iter = iter(enumerate(texts))
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(in_flight) < concurrency:
+                    try:
+                        index, text = next(text_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight[self.submit(text)] = index
+
+                if not in_flight:
+                    return
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        yield index, future.result(), None
+                    except Exception as e:
+                        yield index, None, e
+        finally:
+            # 调用方提前结束时取消剩余查询
+            for future in in_flight:
+                future.cancel()
+
+    def _cancel_all_and_stop(self):
+        """取消所有未完成的查询后停止事件循环（在事件循环线程中执行）"""
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+        self.loop.call_soon(self.loop.stop)
+
+    def shutdown(self):
+        """停止事件循环并释放线程池"""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._cancel_all_and_stop)
+            self.thread.join(timeout=2)
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务健康监控模块
+为每个词典/翻译接口提供熔断器和健康评分，故障接口在冷却期内直接跳过
+"""
+
+import threading
+import time
+
+
+class NotFound:
+    """接口正常响应但没有结果（如词典中没有该单词）"""
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "NOT_FOUND"
+
+
+# 接口返回此值表示"查无此词"：计为成功，调用方得到None
+NOT_FOUND = NotFound()
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=3, base_cooldown=30, max_cooldown=600):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.score = 1.0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.skipped_calls = 0
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """判断当前是否允许调用，冷却结束后只放行一个半开探测请求"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() >= self.open_until:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = True
+                return True
+
+            self.skipped_calls += 1
+            return False
+
+    def record_success(self):
+        """记录一次成功调用"""
+        with self.lock:
+            self.total_calls += 1
+            self.consecutive_failures = 0
+            self.open_count = 0
+            self.probe_in_flight = False
+            self.state = self.CLOSED
+            self._update_score(1.0)
+
+    def record_failure(self):
+        """记录一次失败调用（异常、超时或无有效结果）"""
+        with self.lock:
+            self.total_calls += 1
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self._update_score(0.0)
+
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        """打开熔断器，冷却时间按连续打开次数指数增长"""
+        self.open_count += 1
+        cooldown = min(self.base_cooldown * (2 ** (self.open_count - 1)), self.max_cooldown)
+        self.state = self.OPEN
+        self.open_until = time.monotonic() + cooldown
+        self.probe_in_flight = False
+        print(f"⛔ {self.name} 已熔断，{cooldown:.0f}秒后重试")
+
+    def _update_score(self, outcome, alpha=0.2):
+        """健康评分：成功率的指数移动平均"""
+        self.score = (1 - alpha) * self.score + alpha * outcome
+
+    def get_status(self):
+        """获取熔断器状态"""
+        with self.lock:
+            return {
+                'name': self.name,
+                'state': self.state,
+                'score': self.score,
+                'consecutive_failures': self.consecutive_failures,
+                'total_calls': self.total_calls,
+                'total_failures': self.total_failures,
+                'skipped_calls': self.skipped_calls,
+                'retry_in': max(0.0, self.open_until - time.monotonic()) if self.state == self.OPEN else 0.0
+            }
+
+
+class ProviderHealth:
+    def __init__(self, failure_threshold=3, base_cooldown=30, max_cooldown=600):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get_breaker(self, name):
+        """获取（必要时创建）指定接口的熔断器"""
+        with self.lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(
+                    name, self.failure_threshold, self.base_cooldown, self.max_cooldown)
+            return self.breakers[name]
+
+    def call(self, name, func, *args, **kwargs):
+        """经熔断器调用接口：熔断期间直接返回None
+
+        返回 NOT_FOUND 表示接口正常但查无结果，计为成功并返回None；
+        其余空结果（超时、报错、限流警告、未实现的接口）视为失败
+        """
+        breaker = self.get_breaker(name)
+        if not breaker.allow_request():
+            return None
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            breaker.record_failure()
+            raise
+
+        if result is NOT_FOUND:
+            breaker.record_success()
+            return None
+        if result:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        return result
+
+    def get_summary(self):
+        """获取所有接口的健康状态"""
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return [breaker.get_status() for breaker in breakers]
+
+    def format_summary(self):
+        """生成用于界面显示的健康状态文本"""
+        icons = {
+            CircuitBreaker.CLOSED: "✅",
+            CircuitBreaker.HALF_OPEN: "🟡",
+            CircuitBreaker.OPEN: "⛔"
+        }
+        parts = [f"{icons[status['state']]}{status['name']} {status['score']:.0%}"
+                 for status in self.get_summary()]
+        return " | ".join(parts)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重复请求合并模块
+相同键的并发调用只执行一次，其余调用方等待并共享同一个结果；
+只在查询引擎的事件循环中使用
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        # 键 → [共享的任务, 等待者数量]
+        self.in_flight = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key, func, *args):
+        """执行协程函数func；若相同key的调用正在进行，则等待其结果而不重复执行
+
+        某个调用方被取消不影响其他调用方；所有调用方都取消后，共享的任务才被取消。
+        """
+        flight = self.in_flight.get(key)
+        if flight is None:
+            flight = [asyncio.ensure_future(func(*args)), 0]
+            self.in_flight[key] = flight
+            flight[0].add_done_callback(lambda _: self._finish(key, flight))
+            self.executed += 1
+        else:
+            self.shared += 1
+
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if flight[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            flight[1] -= 1
+
+    def _finish(self, key, flight):
+        """任务完成后移除（键可能已被新的调用占用）"""
+        if self.in_flight.get(key) is flight:
+            del self.in_flight[key]
+
+    def get_stats(self):
+        """获取合并统计：实际执行次数和共享结果次数"""
+        return {
+            'in_flight': len(self.in_flight),
+            'executed': self.executed,
+            'shared': self.shared
+        }
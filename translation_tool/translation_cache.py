@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译结果内存缓存模块
+容量受限的 LRU + TTL 缓存，供 MyMemory 翻译的所有调用点共享
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+class TranslationCache:
+    def __init__(self, max_size=2000, ttl=24 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, text, source_lang, target_lang):
+        """生成缓存键：合并空白后的文本 + 语言对（保留大小写，"May"和"may"的译文不同）"""
+        normalized = re.sub(r'\s+', ' ', text.strip())
+        return (normalized, f"{source_lang}|{target_lang}")
+
+    def get(self, text, source_lang, target_lang):
+        """读取缓存的译文，未命中或已过期返回None"""
+        key = self.make_key(text, source_lang, target_lang)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            translation, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            # 移到末尾，标记为最近使用
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return translation
+
+    def put(self, text, source_lang, target_lang, translation):
+        """写入译文，超出容量时淘汰最久未使用的条目"""
+        key = self.make_key(text, source_lang, target_lang)
+        with self.lock:
+            self.entries[key] = (translation, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存"""
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self):
+        """获取缓存统计信息"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / total if total else 0.0
+            }
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+智能分类翻译器 - 本地HTTP服务模式
+在回环地址上提供 JSON 接口，所有客户端共享同一套缓存和连接池
+
+接口（POST，请求和响应均为JSON）:
+    /classify   {"text": "..."}                                   → 分类结果
+    /lookup     {"word": "..."}                                   → 词典查询结果
+    /translate  {"text": "...", "source_lang": "en", "target_lang": "zh"} → 翻译结果
+    /process    {"text": "..."}                                   → 分类 + 查询 + 卡片数据
+    /card       {"card": {...}} 或 {"text": "..."}                 → Anki卡片正反面
+接口（GET）:
+    /health     服务状态
+    /stats      缓存、接口健康、延迟和连接复用统计
+
+用法:
+    python3 translation_service.py --port 8766
+"""
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from 智能分类翻译器 import SmartTranslator
+from http_transport import get_connection_stats
+
+
+class ParameterError(Exception):
+    """请求参数缺失或类型错误（返回400）"""
+
+
+class TranslationRequestHandler(BaseHTTPRequestHandler):
+    # 共享的无界面翻译器，由 run_service 设置
+    translator = None
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, {'status': 'ok'})
+        elif self.path == "/stats":
+            self.send_json(200, self.get_stats())
+        else:
+            self.send_json(404, {'error': f"未知接口: {self.path}"})
+
+    def do_POST(self):
+        handlers = {
+            '/classify': self.handle_classify,
+            '/lookup': self.handle_lookup,
+            '/translate': self.handle_translate,
+            '/process': self.handle_process,
+            '/card': self.handle_card
+        }
+        # 先读完请求体，保持连接（keep-alive）上的下一个请求完整
+        try:
+            data = self.read_body()
+        except ValueError as e:
+            # 请求体长度无效时无法确定下一个请求的起点，回复后关闭连接
+            self.close_connection = True
+            self.send_json(400, {'error': f"无效的Content-Length: {e}"})
+            return
+
+        handler = handlers.get(self.path)
+        if handler is None:
+            self.send_json(404, {'error': f"未知接口: {self.path}"})
+            return
+
+        try:
+            payload = self.parse_json(data)
+        except ValueError as e:
+            self.send_json(400, {'error': f"请求不是有效的JSON: {e}"})
+            return
+
+        try:
+            status, body = handler(payload)
+        except ParameterError as e:
+            status, body = 400, {'error': str(e)}
+        except Exception as e:
+            status, body = 500, {'error': f"处理出错: {e}"}
+        self.send_json(status, body)
+
+    def handle_classify(self, payload):
+        text = self.get_string(payload, 'text')
+        category, info = self.translator.classify_input(text)
+        return 200, {'category': category, 'info': info}
+
+    def handle_lookup(self, payload):
+        word = self.get_string(payload, 'word').strip()
+        if not word:
+            return 400, {'error': "缺少参数: word"}
+        result = self.translator.dictionary_lookup(word)
+        if not result:
+            return 502, {'error': f"词典查询失败: {word}"}
+        return 200, {'result': result}
+
+    def handle_translate(self, payload):
+        text = self.get_string(payload, 'text').strip()
+        source_lang = self.get_string(payload, 'source_lang', 'en')
+        target_lang = self.get_string(payload, 'target_lang', 'zh')
+        if not text:
+            return 400, {'error': "缺少参数: text"}
+        result = self.translator.translate_text(text, source_lang, target_lang)
+        if not result:
+            return 502, {'error': f"翻译失败: {text}"}
+        return 200, {'result': result}
+
+    def handle_process(self, payload):
+        text = self.get_string(payload, 'text').strip()
+        if not text:
+            return 400, {'error': "缺少参数: text"}
+        outcome = self.translator.engine.submit(text).result()
+        if not outcome['result']:
+            return 502, {'error': f"处理失败: {text}", **outcome}
+        return 200, outcome
+
+    def handle_card(self, payload):
+        card = payload.get('card')
+        if card is not None and not isinstance(card, dict):
+            raise ParameterError("参数 card 必须是JSON对象")
+        if card is None:
+            status, outcome = self.handle_process(payload)
+            if status != 200:
+                return status, outcome
+            card = outcome['card']
+
+        front, back = self.translator.format_anki_card(card)
+        return 200, {'card': card, 'front': front, 'back': back}
+
+    def get_stats(self):
+        """汇总共享状态的统计信息"""
+        return {
+            'dictionary_cache': self.translator.dictionary_cache.get_stats(),
+            'translation_cache': self.translator.translation_cache.get_stats(),
+            'coalesced_lookups': self.translator.engine.inflight_lookups.get_stats(),
+            'providers': self.translator.provider_health.get_summary(),
+            'latency': self.translator.latency_tracker.get_stats(),
+            'connections': get_connection_stats(self.translator.session)
+        }
+
+    def read_body(self):
+        """读取完整的请求体，Content-Length无效时抛出ValueError"""
+        length = int(self.headers.get('Content-Length', 0))
+        if length < 0:
+            raise ValueError(length)
+        return self.rfile.read(length) if length else b''
+
+    def parse_json(self, data):
+        """解析请求体JSON"""
+        if not data:
+            return {}
+        data = json.loads(data.decode('utf-8'))
+        if not isinstance(data, dict):
+            raise ValueError("请求体必须是JSON对象")
+        return data
+
+    def get_string(self, payload, name, default=''):
+        """读取字符串参数，类型不对时抛出ParameterError"""
+        value = payload.get(name, default)
+        if not isinstance(value, str):
+            raise ParameterError(f"参数 {name} 必须是字符串")
+        return value
+
+    def send_json(self, status, body):
+        """发送JSON响应"""
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+
+def run_service(host="127.0.0.1", port=8766):
+    """启动本地翻译服务（阻塞直到Ctrl+C）"""
+    translator = SmartTranslator(headless=True)
+    TranslationRequestHandler.translator = translator
+
+    server = ThreadingHTTPServer((host, port), TranslationRequestHandler)
+    server.daemon_threads = True
+    print(f"🚀 智能翻译服务已启动: http://{host}:{server.server_port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 正在停止服务...")
+    finally:
+        server.server_close()
+        translator.engine.shutdown()
+        print("👋 智能翻译服务已关闭")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="智能分类翻译器 - 本地HTTP服务模式")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认仅本机回环）")
+    parser.add_argument("--port", type=int, default=8766, help="监听端口（默认8766）")
+    args = parser.parse_args(argv)
+    run_service(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
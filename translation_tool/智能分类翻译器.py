@@ -12,41 +12,134 @@ from tkinter import ttk, messagebox, filedialog
 import requests
 import json
 import re
-import threading
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from anki_connect import AnkiConnect
+from anki_outbox import AnkiOutbox, STATUS_SENT, STATUS_FAILED, STATUS_DUPLICATE
+from card_store import CardStore
+from card_journal import CardJournal
+from apkg_writer import ApkgWriter
+from export_manifest import ExportManifest
+from fallback_journal import FallbackJournal
+from dictionary_cache import DictionaryCache
+from translation_cache import TranslationCache
+from lookup_engine import LookupEngine
+from provider_health import ProviderHealth, NOT_FOUND
+from latency_tracker import LatencyTracker
+from http_transport import create_session, get_connection_stats
+
+# 批量翻译时每个片段独占一行并带编号标记，拆分时逐个核对编号（MyMemory会保留换行和编号）
+BATCH_DELIMITER = "\n"
+BATCH_MARKER = "[{}] "
+# 译文中的编号标记（兼容翻译为全角括号的情况）
+BATCH_MARKER_PATTERN = re.compile(r'[\[【]\s*(\d+)\s*[\]】]')
 
 class SmartTranslator:
-    def __init__(self):
-        self.root = tk.Tk()
-        self.root.title("📚 Books Anki 智能翻译器 - 升级版")
-        self.root.geometry("900x800")
-        self.root.configure(bg="white")
-        
-        # 初始化会话
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
-        
-        # 词卡数据存储
-        self.cards_data = []
+    def __init__(self, headless=False, lookup_workers=8):
+        # 无界面模式（批处理/服务）不创建Tk窗口，也不连接Anki
+        self.headless = headless
+        
+        if not headless:
+            self.root = tk.Tk()
+            self.root.title("📚 Books Anki 智能翻译器 - 升级版")
+            self.root.geometry("900x800")
+            self.root.configure(bg="white")
+        
+        # 词典接口线程池和释义/例句翻译线程池的大小
+        dictionary_workers = 5
+        translation_workers = 6
+        
+        # 初始化会话（所有词典/翻译接口共享连接池，GET请求带退避重试）；
+        # 每个主机的连接数按可能同时发出请求的线程总数设置，避免连接池满后丢弃连接
+        self.session = create_session(pool_connections=10,
+                                      pool_maxsize=lookup_workers + dictionary_workers + translation_workers,
+                                      retries=2)
+        
+        # 各接口延迟统计与自适应超时（默认值, 下限, 上限，单位秒）
+        self.latency_tracker = LatencyTracker()
+        timeout_limits = {
+            'wordnik_definitions': (5, 1.5, 10),
+            'wordnik_pronunciation': (3, 1, 6),
+            'wordnik_examples': (3, 1, 6),
+            'dictionaryapi_dev': (5, 1.5, 10),
+            'mymemory': (8, 2, 15),
+            'ankiconnect': (10, 2, 30)
+        }
+        for endpoint, (default, floor, ceiling) in timeout_limits.items():
+            self.latency_tracker.configure(endpoint, default, floor, ceiling)
+        
+        # 词典查询缓存（dictionaries/dictionary.db）
+        self.dictionary_cache = DictionaryCache()
+        
+        # MyMemory翻译结果缓存（主翻译、释义、例句共享）
+        self.translation_cache = TranslationCache(max_size=2000, ttl=24 * 3600)
+        
+        # 词典/翻译接口熔断器与健康评分
+        self.provider_health = ProviderHealth(failure_threshold=3, base_cooldown=30, max_cooldown=600)
+        
+        # 在线词典查询模式: sequential（依次查询）/ parallel（并发查询）/ hedged（延迟对冲）
+        self.dictionary_query_mode = "parallel"
+        self.dictionary_hedge_delay = 1.0
+        # 在线词典接口（按优先级排列）
+        self.dictionary_providers = [
+            self.query_wordnik_api,
+            self.query_dictionaryapi_dev,
+            self.query_words_api,
+            self.query_collins_api,
+            self.query_merriam_webster_api
+        ]
+        self.dictionary_executor = ThreadPoolExecutor(max_workers=dictionary_workers, thread_name_prefix="dictionary-api")
+        
+        # 释义/例句翻译线程池（有界并发）
+        self.translation_executor = ThreadPoolExecutor(max_workers=translation_workers, thread_name_prefix="translate")
+        
+        # MyMemory单次请求的查询长度上限（UTF-8字节）
+        self.mymemory_query_limit = 500
+        
+        # 异步查询引擎（单个后台事件循环驱动所有查询；批处理按并发数设置线程数）
+        self.engine = LookupEngine(self, max_workers=lookup_workers)
+        
+        # 词卡数据存储（按输入建立索引，O(1)判重）
+        self.cards_data = CardStore()
+        # 导出时是否同时生成.apkg牌组包
+        self.export_apkg = True
+        
+        # 卡片模板版本：修改 format_anki_card 的输出格式时递增，使词卡存储中保存的渲染结果失效
+        self.card_template_version = 1
         self.current_translation = None
         
+        # 翻译请求代数：新请求使旧请求的结果失效
+        self.translation_generation = 0
+        self.pending_translation = None
+        
         # 自动导入标志
         self.auto_import_after_translation = False
         
+        if headless:
+            self.anki_connected = False
+            return
+        
         # 初始化AnkiConnect
         self.setup_anki_connect()
         
         # 设置Anki文件夹
         self.setup_anki_folder()
         
+        # 恢复上次会话的词卡（需在界面创建前完成，以显示词卡数量）
+        self.setup_card_journal()
+        
+        # 设置Anki导入队列
+        self.setup_anki_outbox()
+        
         # 设置界面
         self.setup_ui()
         
+        # 启动后台导入（界面就绪后才能显示导入状态）
+        self.anki_outbox.start()
+        
         print("✅ 智能分类翻译器升级版初始化完成")
         
     def setup_anki_connect(self):
@@ -55,23 +148,15 @@ class SmartTranslator:
             self.anki = AnkiConnect(
                 api_key="MY_SECRET_KEY_123",
                 host="127.0.0.1", 
-                port=8765
+                port=8765,
+                latency_tracker=self.latency_tracker
             )
             
-            # 测试连接
-            success, message = self.anki.test_connection()
+            # 一次请求完成：测试连接、确保"阅读中的收获"牌组存在、缓存模板列表
+            success, message = self.anki.prepare("阅读中的收获")
             if success:
                 print(f"✅ AnkiConnect连接成功: {message}")
                 self.anki_connected = True
-                
-                # 确保"阅读中的收获"牌组存在
-                decks = self.anki.get_deck_names()
-                if "阅读中的收获" not in decks:
-                    success, msg = self.anki.create_deck("阅读中的收获")
-                    if success:
-                        print(f"✅ 创建牌组: {msg}")
-                    else:
-                        print(f"⚠️ 创建牌组失败: {msg}")
             else:
                 print(f"⚠️ AnkiConnect连接失败: {message}")
                 self.anki_connected = False
@@ -86,6 +171,35 @@ class SmartTranslator:
         self.anki_folder.mkdir(exist_ok=True)
         print(f"📁 Anki卡片保存路径: {self.anki_folder}")
         
+        # 导入失败的卡片追加到轮转的分段文件中
+        self.fallback_journal = FallbackJournal(self.anki_folder / "待导入卡片")
+        
+    def setup_card_journal(self):
+        """设置词卡会话日志：重放日志恢复词卡列表，必要时压缩"""
+        self.card_journal = CardJournal(self.anki_folder / "cards_journal.jsonl")
+        try:
+            start_time = time.perf_counter()
+            restored = self.card_journal.replay(self.cards_data)
+            if restored:
+                elapsed = (time.perf_counter() - start_time) * 1000
+                print(f"🗂️ 已恢复上次会话的 {restored} 张词卡 ({elapsed:.1f}ms)")
+            if self.card_journal.maybe_compact(self.cards_data):
+                print("🗜️ 词卡日志已压缩")
+        except Exception as e:
+            print(f"⚠️ 恢复词卡日志失败: {e}")
+        
+    def setup_anki_outbox(self):
+        """设置Anki导入队列：卡片先持久化到本地，后台批量导入Anki"""
+        self.anki_outbox = AnkiOutbox(
+            self.anki_folder / "anki_outbox.db",
+            self.anki,
+            deck_name="阅读中的收获",
+            on_status=self._on_outbox_status
+        )
+        counts = self.anki_outbox.get_counts()
+        if counts['pending']:
+            print(f"📤 导入队列中有 {counts['pending']} 张卡片等待导入Anki")
+        
     def setup_ui(self):
         """设置用户界面"""
         # 主容器
@@ -120,6 +234,20 @@ class SmartTranslator:
                                          fg=anki_status_color)
         self.anki_status_label.pack(pady=5)
         
+        # 词典/翻译服务健康状态
+        self.health_status_label = tk.Label(anki_status_frame,
+                                           text="",
+                                           font=("Arial", 10),
+                                           bg="white", fg="gray")
+        self.health_status_label.pack()
+        
+        # Anki导入队列状态
+        self.outbox_status_label = tk.Label(anki_status_frame,
+                                           text="",
+                                           font=("Arial", 10),
+                                           bg="white", fg="gray")
+        self.outbox_status_label.pack()
+        
         # Books使用提示
         books_tip_label = tk.Label(main_container,
                                   text="💡 使用技巧：在Books中复制文本，然后在此处翻译并制作Anki卡片",
@@ -230,6 +358,13 @@ class SmartTranslator:
                              relief="raised", bd=2)
         export_btn.pack(side=tk.LEFT, padx=(0, 10))
         
+        incremental_export_btn = tk.Button(button_frame, text="📤 增量导出", 
+                                         command=lambda: self.export_anki(incremental=True),
+                                         font=("Arial", 10, "bold"),
+                                         bg="lightsalmon", fg="darkred",
+                                         relief="raised", bd=2)
+        incremental_export_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
         clear_btn = tk.Button(button_frame, text="🗑️ 清空卡片", 
                             command=self.clear_cards,
                             font=("Arial", 11, "bold"),
@@ -246,7 +381,40 @@ class SmartTranslator:
         
         # 初始化显示
         self.show_welcome_message()
+        self.update_health_status()
+        self.update_outbox_status()
+        
+    def update_health_status(self):
+        """刷新服务健康状态显示（每5秒）"""
+        summary = self.provider_health.format_summary()
+        self.health_status_label.configure(
+            text=f"🩺 服务状态: {summary}" if summary else "🩺 服务状态: 暂无查询记录")
+        self.root.after(5000, self.update_health_status)
+    
+    def update_outbox_status(self):
+        """刷新Anki导入队列状态显示"""
+        counts = self.anki_outbox.get_counts()
+        self.outbox_status_label.configure(
+            text=f"📤 导入队列: 待导入 {counts['pending']} | 已导入 {counts['sent']} | 重复 {counts['duplicate']} | 失败 {counts['failed']}",
+            fg="darkorange" if counts['pending'] or counts['failed'] else "gray")
+    
+    def _on_outbox_status(self, outbox_id, status, message, card):
+        """导入队列状态回调（在后台线程中执行）"""
+        word = card.get('word', card.get('input', '')) if card else outbox_id
+        if status == STATUS_SENT:
+            print(f"✅ AnkiConnect导入成功: {word} - {message}")
+        elif status == STATUS_DUPLICATE:
+            print(f"ℹ️ 卡片已在Anki中，跳过: {word}")
+        elif status == STATUS_FAILED:
+            print(f"❌ AnkiConnect导入失败: {word} - {message}")
+            # 多次重试仍失败，保存到待导入卡片文件以免丢失
+            if card:
+                self.save_fallback_card(card)
+        else:
+            print(f"⚠️ AnkiConnect导入暂未成功，将重试: {word} - {message}")
         
+        self.root.after(0, self.update_outbox_status)
+    
     def paste_from_clipboard(self):
         """从剪贴板粘贴内容"""
         try:
@@ -375,24 +543,40 @@ class SmartTranslator:
         self.result_text.insert(tk.END, f"🔍 正在处理 '{text}'，请稍候...\n")
         self.root.update()
         
-        # 在新线程中执行翻译
-        threading.Thread(target=self._do_smart_translation, 
-                        args=(text, category, info), daemon=True).start()
+        # 取消尚未完成的上一次请求，其结果不会再更新界面或生成卡片
+        self.translation_generation += 1
+        generation = self.translation_generation
+        if self.pending_translation is not None and not self.pending_translation.done():
+            self.pending_translation.cancel()
+        
+        # 提交到异步查询引擎，完成后回调
+        future = self.engine.submit(text, category, info)
+        self.pending_translation = future
+        future.add_done_callback(
+            lambda f: self._on_translation_done(f, text, category, info, generation))
+    
+    def get_langpair(self, category):
+        """根据分类确定翻译方向"""
+        if category in ["chinese_word", "chinese_sentence"]:
+            return "zh", "en"
+        return "en", "zh"
     
-    def _do_smart_translation(self, text, category, info):
-        """执行智能翻译（在后台线程中）"""
+    def _on_translation_done(self, future, text, category, info, generation):
+        """查询完成回调（在引擎线程中执行），转到主线程处理结果"""
+        if future.cancelled() or generation != self.translation_generation:
+            print(f"⏭️ 丢弃过期的翻译结果: {text}")
+            return
+        
+        self.root.after(0, lambda: self._apply_translation_result(future, text, category, info, generation))
+    
+    def _apply_translation_result(self, future, text, category, info, generation):
+        """在主线程中应用翻译结果（再次确认请求未被新请求取代）"""
+        if generation != self.translation_generation:
+            print(f"⏭️ 丢弃过期的翻译结果: {text}")
+            return
+        
         try:
-            if category == "english_word":
-                # 英文单词 → 词典查询
-                result = self.dictionary_lookup(text)
-            elif category in ["english_phrase", "english_sentence"]:
-                # 英文短语/句子 → 英译中
-                result = self.translate_text(text, "en", "zh")
-            elif category in ["chinese_word", "chinese_sentence"]:
-                # 中文内容 → 中译英
-                result = self.translate_text(text, "zh", "en")
-            else:
-                result = None
+            result = future.result()['result']
             
             if result:
                 self.current_translation = {
@@ -402,8 +586,7 @@ class SmartTranslator:
                     'result': result
                 }
                 
-                # 在主线程中更新UI
-                self.root.after(0, lambda: self.display_result(result, category, info))
+                self.display_result(result, category, info)
                 
                 # 检查是否需要自动导入
                 if self.auto_import_after_translation:
@@ -414,11 +597,11 @@ class SmartTranslator:
                     self.root.after(1500, self.add_to_anki)
             else:
                 self.auto_import_after_translation = False  # 重置标志
-                self.root.after(0, lambda: self.show_error("处理失败，请检查网络连接或稍后重试"))
+                self.show_error("处理失败，请检查网络连接或稍后重试")
                 
         except Exception as e:
             self.auto_import_after_translation = False  # 重置标志
-            self.root.after(0, lambda: self.show_error(f"处理出错: {str(e)}"))
+            self.show_error(f"处理出错: {str(e)}")
     
     def _show_import_status(self):
         """显示即将导入的状态"""
@@ -432,30 +615,8 @@ class SmartTranslator:
             self.root.update()
     
     def dictionary_lookup(self, word):
-        """词典查询功能"""
-        # 首先尝试本地词典
-        local_result = self.get_local_dictionary(word)
-        if local_result and local_result.get('found'):
-            return local_result
-        
-        # 尝试在线词典API
-        online_result = self.get_online_dictionary(word)
-        if online_result:
-            return online_result
-        
-        # 如果词典查询失败，尝试翻译
-        translation_result = self.translate_text(word, "en", "zh")
-        if translation_result:
-            return {
-                'type': 'translation_fallback',
-                'word': word,
-                'translation': translation_result.get('translation', ''),
-                'phonetic': '',
-                'definitions': [],
-                'examples': []
-            }
-        
-        return None
+        """词典查询功能（同步接口，在查询引擎中执行）"""
+        return self.engine.run(self.engine.dictionary_lookup(word))
     
     def get_local_dictionary(self, word):
         """本地词典查询"""
@@ -778,29 +939,22 @@ class SmartTranslator:
         
         return {'found': False}
     
-    def get_online_dictionary(self, word):
-        """多接口在线词典查询"""
-        # 尝试多个词典API，提高查询成功率
-        apis = [
-            self.query_wordnik_api,
-            self.query_dictionaryapi_dev,
-            self.query_words_api,
-            self.query_collins_api,
-            self.query_merriam_webster_api
-        ]
-        
-        for api_func in apis:
-            try:
-                result = api_func(word)
-                if result:
-                    print(f"✅ 词典查询成功: {api_func.__name__}")
-                    return result
-            except Exception as e:
-                print(f"❌ {api_func.__name__} 查询失败: {e}")
-                continue
-        
-        print(f"❌ 所有词典API查询失败: {word}")
-        return None
+    def timed_get(self, endpoint, url, **kwargs):
+        """发送GET请求：超时时间由该接口的延迟统计推算，并记录本次耗时"""
+        timeout = self.latency_tracker.get_timeout(endpoint)
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=timeout, **kwargs)
+        except requests.exceptions.Timeout:
+            self.latency_tracker.record(endpoint, timeout, timed_out=True)
+            raise
+        self.latency_tracker.record(endpoint, time.monotonic() - start)
+        return response
+    
+    def call_dictionary_provider(self, api_func, word):
+        """经熔断器调用词典接口，熔断中的接口直接跳过"""
+        name = api_func.__name__.replace('query_', '').replace('_api', '')
+        return self.provider_health.call(name, api_func, word)
     
     def query_wordnik_api(self, word):
         """Wordnik API查询"""
@@ -819,7 +973,11 @@ class SmartTranslator:
                 'api_key': api_key
             }
             
-            def_response = self.session.get(def_url, params=def_params, timeout=5)
+            def_response = self.timed_get('wordnik_definitions', def_url, params=def_params)
+            
+            # 查无此词是正常响应，不计入接口故障
+            if def_response.status_code == 404:
+                return NOT_FOUND
             
             if def_response.status_code == 200:
                 definitions_data = def_response.json()
@@ -828,29 +986,20 @@ class SmartTranslator:
                     # 获取音标
                     phonetic = self.get_wordnik_pronunciation(word, api_key)
                     
-                    # 处理定义
-                    definitions = []
+                    # 收集定义
+                    def_items = []
                     for def_item in definitions_data[:3]:
                         pos = def_item.get('partOfSpeech', '')
                         def_text = def_item.get('text', '')
                         if def_text:
-                            # 翻译定义为中文
-                            chinese_def = self.translate_definition(def_text)
-                            if chinese_def:
-                                definitions.append({'pos': pos, 'def': chinese_def})
-                            else:
-                                definitions.append({'pos': pos, 'def': def_text})
+                            def_items.append((pos, def_text))
                     
-                    # 获取例句
-                    examples = self.get_wordnik_examples(word, api_key)
+                    # 获取例句原文
+                    example_texts = self.fetch_wordnik_example_texts(word, api_key)
                     
-                    return {
-                        'type': 'dictionary',
-                        'word': word,
-                        'phonetic': phonetic,
-                        'definitions': definitions,
-                        'examples': examples
-                    }
+                    # 返回英文原始词条，胜出后再翻译
+                    return self.build_raw_dictionary_entry(word, phonetic, def_items, example_texts)
+                return NOT_FOUND
         except Exception as e:
             print(f"Wordnik API查询失败: {e}")
         
@@ -866,7 +1015,7 @@ class SmartTranslator:
                 'api_key': api_key
             }
             
-            pron_response = self.session.get(pron_url, params=pron_params, timeout=3)
+            pron_response = self.timed_get('wordnik_pronunciation', pron_url, params=pron_params)
             if pron_response.status_code == 200:
                 pron_data = pron_response.json()
                 if pron_data and len(pron_data) > 0:
@@ -877,8 +1026,8 @@ class SmartTranslator:
             pass
         return ''
     
-    def get_wordnik_examples(self, word, api_key):
-        """获取Wordnik例句"""
+    def fetch_wordnik_example_texts(self, word, api_key):
+        """获取Wordnik例句原文"""
         try:
             ex_url = f"https://api.wordnik.com/v4/word.json/{word}/examples"
             ex_params = {
@@ -888,7 +1037,7 @@ class SmartTranslator:
                 'api_key': api_key
             }
             
-            ex_response = self.session.get(ex_url, params=ex_params, timeout=3)
+            ex_response = self.timed_get('wordnik_examples', ex_url, params=ex_params)
             if ex_response.status_code == 200:
                 ex_data = ex_response.json()
                 examples = []
@@ -896,12 +1045,7 @@ class SmartTranslator:
                     for ex in ex_data['examples'][:2]:
                         text = ex.get('text', '')
                         if text and len(text) < 200:  # 限制例句长度
-                            # 翻译例句
-                            chinese_ex = self.translate_example(text)
-                            if chinese_ex:
-                                examples.append(f"{text} {chinese_ex}")
-                            else:
-                                examples.append(text)
+                            examples.append(text)
                 return examples
         except:
             pass
@@ -911,7 +1055,11 @@ class SmartTranslator:
         """DictionaryAPI.dev查询（原有接口）"""
         try:
             url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
-            response = self.session.get(url, timeout=5)
+            response = self.timed_get('dictionaryapi_dev', url)
+            
+            # 查无此词是正常响应（404），不计入接口故障
+            if response.status_code == 404:
+                return NOT_FOUND
             
             if response.status_code == 200:
                 data = response.json()
@@ -927,8 +1075,8 @@ class SmartTranslator:
                                 break
                     
                     # 提取定义和例句
-                    definitions = []
-                    examples = []
+                    def_items = []
+                    example_texts = []
                     
                     if 'meanings' in entry:
                         for meaning in entry['meanings'][:3]:
@@ -936,27 +1084,15 @@ class SmartTranslator:
                             for definition in meaning.get('definitions', [])[:2]:
                                 def_text = definition.get('definition', '')
                                 if def_text:
-                                    chinese_def = self.translate_definition(def_text)
-                                    if chinese_def:
-                                        definitions.append({'pos': pos, 'def': chinese_def})
-                                    else:
-                                        definitions.append({'pos': pos, 'def': def_text})
+                                    def_items.append((pos, def_text))
                                 
                                 example = definition.get('example', '')
-                                if example and len(examples) < 3:
-                                    chinese_example = self.translate_example(example)
-                                    if chinese_example:
-                                        examples.append(f"{example} {chinese_example}")
-                                    else:
-                                        examples.append(example)
+                                if example and len(example_texts) < 3:
+                                    example_texts.append(example)
                     
-                    return {
-                        'type': 'dictionary',
-                        'word': word,
-                        'phonetic': phonetic,
-                        'definitions': definitions,
-                        'examples': examples
-                    }
+                    # 返回英文原始词条，胜出后再翻译
+                    return self.build_raw_dictionary_entry(word, phonetic, def_items, example_texts)
+                return NOT_FOUND
         except Exception as e:
             print(f"DictionaryAPI.dev查询失败: {e}")
         
@@ -1005,53 +1141,108 @@ class SmartTranslator:
         
         return None
     
-    def translate_definition(self, definition):
-        """翻译英文定义为中文"""
-        try:
-            # 使用简单的翻译API
-            translation = self.translate_with_mymemory(definition, 'en', 'zh')
-            if translation and len(translation) > 0:
-                return translation
-        except:
-            pass
-        return None
-    
-    def translate_example(self, example):
-        """翻译例句为中文"""
-        try:
-            # 使用简单的翻译API
-            translation = self.translate_with_mymemory(example, 'en', 'zh')
-            if translation and len(translation) > 0:
-                return f"({translation})"
-        except:
-            pass
-        return None
+    def build_raw_dictionary_entry(self, word, phonetic, def_items, example_texts):
+        """未翻译的词典词条：def_items为(词性, 英文释义)列表，example_texts为英文例句列表"""
+        return {
+            'type': 'dictionary',
+            'word': word,
+            'phonetic': phonetic,
+            'def_items': def_items,
+            'example_texts': example_texts
+        }
     
     def translate_text(self, text, source_lang, target_lang):
-        """文本翻译功能"""
-        # 尝试多个翻译API
-        translation = None
+        """文本翻译功能（同步接口，在查询引擎中执行）"""
+        return self.engine.run(self.engine.translate_text(text, source_lang, target_lang))
+    
+    def translate_batch(self, texts, source_lang, target_lang):
+        """批量翻译多个短文本（同步接口，在查询引擎中执行）
         
-        # 1. 尝试MyMemory API
-        translation = self.translate_with_mymemory(text, source_lang, target_lang)
+        返回与texts等长的列表，失败位置为None。
+        """
+        return self.engine.run(self.engine.translate_batch(texts, source_lang, target_lang))
+    
+    def _pack_batch_segments(self, segments):
+        """按MyMemory查询长度上限将片段贪心打包（计入编号标记和分隔符），超长片段单独成组"""
+        delimiter_size = len(BATCH_DELIMITER.encode('utf-8'))
+        chunks = []
+        current = []
+        current_size = 0
+        
+        for segment in segments:
+            segment_size = len(self._flatten_segment(segment).encode('utf-8'))
+            added_size = segment_size + len(BATCH_MARKER.format(len(current) + 1)) + \
+                (delimiter_size if current else 0)
+            if current and current_size + added_size > self.mymemory_query_limit:
+                chunks.append(current)
+                current = []
+                current_size = 0
+                added_size = segment_size + len(BATCH_MARKER.format(1))
+            current.append(segment)
+            current_size += added_size
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _flatten_segment(self, segment):
+        """将片段内部的换行等空白折叠为空格，避免与分隔符冲突"""
+        return re.sub(r'\s+', ' ', segment).strip()
+    
+    def _translate_batch_chunk(self, chunk, source_lang, target_lang):
+        """翻译一组打包的片段，结果无法对齐时回退为逐条翻译"""
+        if len(chunk) == 1:
+            return [self.translate_with_mymemory(chunk[0], source_lang, target_lang)]
+        
+        joined = BATCH_DELIMITER.join(BATCH_MARKER.format(index) + self._flatten_segment(segment)
+                                      for index, segment in enumerate(chunk, 1))
+        translation = self._request_mymemory(joined, source_lang, target_lang)
+        parts = self._split_batch_translation(translation, len(chunk))
+        
+        if parts is None:
+            print(f"⚠️ 批量翻译结果无法对齐，回退为逐条翻译 ({len(chunk)} 条)")
+            return [self.translate_with_mymemory(segment, source_lang, target_lang) for segment in chunk]
+        
+        for segment, part in zip(chunk, parts):
+            self.translation_cache.put(segment, source_lang, target_lang, part)
+        return parts
+    
+    def _split_batch_translation(self, translation, expected_count):
+        """按编号标记拆分批量译文
         
-        # 2. 如果失败，尝试其他API或本地翻译
+        编号必须依次为1..expected_count且每段非空，否则（片段被拆开、合并或丢失）返回None。
+        """
         if not translation:
-            translation = self.translate_with_fallback(text, source_lang, target_lang)
-        
-        if translation:
-            return {
-                'type': 'translation',
-                'original': text,
-                'translation': translation,
-                'source_lang': source_lang,
-                'target_lang': target_lang
-            }
+            return None
         
-        return None
+        pieces = BATCH_MARKER_PATTERN.split(translation)
+        # pieces: [标记前的内容, 编号1, 译文1, 编号2, 译文2, ...]
+        if pieces[0].strip():
+            return None
+        numbers = [int(number) for number in pieces[1::2]]
+        parts = [part.strip() for part in pieces[2::2]]
+        if numbers != list(range(1, expected_count + 1)) or not all(parts):
+            return None
+        return parts
     
     def translate_with_mymemory(self, text, source_lang, target_lang):
         """使用MyMemory API翻译"""
+        cached = self.translation_cache.get(text, source_lang, target_lang)
+        if cached is not None:
+            return cached
+        
+        translation = self._request_mymemory(text, source_lang, target_lang)
+        if translation:
+            self.translation_cache.put(text, source_lang, target_lang, translation)
+        return translation
+    
+    def _request_mymemory(self, text, source_lang, target_lang):
+        """发送一次MyMemory翻译请求（不经过缓存，经过熔断器）"""
+        return self.provider_health.call("mymemory", self._fetch_mymemory_translation,
+                                         text, source_lang, target_lang)
+    
+    def _fetch_mymemory_translation(self, text, source_lang, target_lang):
+        """请求MyMemory API"""
         try:
             url = "https://api.mymemory.translated.net/get"
             params = {
@@ -1059,7 +1250,7 @@ class SmartTranslator:
                 'langpair': f'{source_lang}|{target_lang}'
             }
             
-            response = self.session.get(url, params=params, timeout=8)
+            response = self.timed_get('mymemory', url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -1208,76 +1399,52 @@ class SmartTranslator:
         result = self.current_translation['result']
         
         # 检查是否已存在
-        for card in self.cards_data:
-            if card['input'].lower() == input_text.lower():
-                messagebox.showinfo("提示", f"内容 '{input_text}' 已存在于卡片列表中")
-                return
+        if self.cards_data.contains(input_text):
+            messagebox.showinfo("提示", f"内容 '{input_text}' 已存在于卡片列表中")
+            return
         
         # 创建卡片数据
         card_data = self.create_anki_card_data(input_text, category, result)
         
-        # 尝试通过AnkiConnect自动导入
-        if self.anki_connected:
-            success = self.import_to_anki_directly(card_data)
-            if success:
-                self.cards_data.append(card_data)
-                self.update_cards_count()
-                
-                word = card_data.get('word', input_text)
-                messagebox.showinfo("成功", 
-                                  f"✅ 已自动导入到Anki\n"
-                                  f"📚 牌组: 阅读中的收获\n"
-                                  f"📝 单词: {word}")
-                return
-            else:
-                # AnkiConnect失败，回退到文件保存
-                messagebox.showwarning("警告", "AnkiConnect导入失败，将保存为文件")
-        
-        # 生成独立的Anki卡片文件（备用方案）
-        success = self.create_individual_anki_file(card_data)
+        # 写入导入队列，后台批量导入Anki；Anki未打开时保留在队列中，恢复后自动重试
+        try:
+            front, back, tags = self.build_anki_note(card_data)
+            self.anki_outbox.enqueue(front, back, tags, card_data)
+        except Exception as e:
+            messagebox.showerror("错误", f"'{input_text}' 加入Anki导入队列失败: {str(e)}")
+            return
         
-        if success:
-            self.cards_data.append(card_data)
-            self.update_cards_count()
-            
-            word = card_data.get('word', input_text)
-            messagebox.showinfo("成功", 
-                              f"✅ 已为 '{word}' 生成独立Anki卡片\n"
-                              f"📁 保存位置: {self.anki_folder}")
-        else:
-            messagebox.showerror("错误", f"生成 '{input_text}' 的Anki卡片失败")
-    
-    def import_to_anki_directly(self, card_data):
-        """通过AnkiConnect直接导入到Anki"""
+        self.cards_data.add(card_data)
+        # 入队时已渲染过，保存结果供之后的导出复用
+        self.cards_data.set_rendered(card_data, self.card_template_version, (front, back))
         try:
-            # 格式化卡片内容
-            front, back = self.format_anki_card(card_data)
-            
-            # 添加标签
-            tags = ["智能翻译", "阅读"]
-            if card_data['type'] == 'dictionary':
-                tags.append("单词")
-            else:
-                tags.append("句子")
-            
-            # 导入到Anki
-            success, message = self.anki.add_note(
-                front=front,
-                back=back,
-                deck_name="阅读中的收获",
-                tags=tags
-            )
-            
-            if success:
-                print(f"✅ AnkiConnect导入成功: {message}")
-                return True
-            else:
-                print(f"❌ AnkiConnect导入失败: {message}")
-                return False
-                
+            self.card_journal.append_add(card_data)
         except Exception as e:
-            print(f"❌ AnkiConnect导入异常: {e}")
-            return False
+            print(f"⚠️ 写入词卡日志失败: {e}")
+        self.update_cards_count()
+        self.update_outbox_status()
+        
+        word = card_data.get('word', input_text)
+        status_text = "将在后台自动导入" if self.anki_connected else "Anki未连接，连接后自动导入"
+        messagebox.showinfo("成功", 
+                          f"✅ 已加入Anki导入队列\n"
+                          f"📚 牌组: 阅读中的收获\n"
+                          f"📝 单词: {word}\n"
+                          f"⏳ {status_text}")
+    
+    def build_anki_note(self, card_data):
+        """生成Anki卡片的正面、背面和标签"""
+        # 格式化卡片内容
+        front, back = self.format_anki_card(card_data)
+        
+        # 添加标签
+        tags = ["智能翻译", "阅读"]
+        if card_data['type'] == 'dictionary':
+            tags.append("单词")
+        else:
+            tags.append("句子")
+        
+        return front, back, tags
     
     def translate_and_import(self):
         """一键翻译并导入到Anki - 与智能翻译完全相同的显示效果"""
@@ -1298,6 +1465,10 @@ class SmartTranslator:
             # 重新初始化AnkiConnect
             self.setup_anki_connect()
             
+            # 导入队列改用新连接，并立即尝试导入积压的卡片
+            self.anki_outbox.anki = self.anki
+            self.anki_outbox.wake()
+            
             # 更新状态显示
             anki_status_text = "🔗 AnkiConnect已连接 - 自动导入到「阅读中的收获」" if self.anki_connected else "⚠️ AnkiConnect未连接 - 仅保存到文件"
             anki_status_color = "darkgreen" if self.anki_connected else "darkorange"
@@ -1317,82 +1488,20 @@ class SmartTranslator:
         except Exception as e:
             messagebox.showerror("错误", f"重连失败: {str(e)}")
     
-    def create_individual_anki_file(self, card_data):
-        """为单个卡片创建独立的Anki文件"""
+    def save_fallback_card(self, card_data):
+        """将无法导入Anki的卡片追加到待导入卡片文件（按大小/时间轮转）"""
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             word = card_data.get('word', card_data.get('input', 'unknown'))
-            safe_word = self.sanitize_filename(word)
-            
-            filename = self.anki_folder / f"{safe_word}_{timestamp}.txt"
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                front, back = self.format_anki_card(card_data)
-                f.write(f"{front}\t{back}\t智能翻译\n")
-            
-            # 创建单个卡片的导入说明
-            self.create_individual_import_instructions(filename, card_data)
-            
+            front, back, tags = self.build_anki_note(card_data)
+            segment = self.fallback_journal.append(
+                self.format_anki_tsv_line(front, back, tags), word, card_data['type'])
+            print(f"💾 已保存到待导入卡片文件: {segment.name}")
             return True
             
         except Exception as e:
-            print(f"❌ 创建独立Anki文件失败: {e}")
+            print(f"❌ 保存待导入卡片失败: {e}")
             return False
     
-    def create_individual_import_instructions(self, card_file, card_data):
-        """为单个卡片创建导入说明"""
-        instruction_file = card_file.parent / f"{card_file.stem}_导入说明.txt"
-        
-        word = card_data.get('word', card_data.get('input', ''))
-        card_type = "词典卡片" if card_data['type'] == 'dictionary' else "翻译卡片"
-        
-        instructions = f"""🧠 智能分类翻译器 - 单词卡片导入说明
-
-单词: {word}
-卡片类型: {card_type}
-文件: {card_file.name}
-创建时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-🚀 导入步骤:
-1. 打开Anki软件
-2. 点击"导入文件"或使用快捷键 Ctrl+Shift+I (Mac: Cmd+Shift+I)
-3. 选择文件: {card_file.name}
-4. 设置导入选项:
-   - 字段分隔符: 制表符 (Tab)
-   - 字段映射:
-     * 字段1 → 正面 (Front)
-     * 字段2 → 背面 (Back)
-     * 字段3 → 标签 (Tags)
-5. 选择目标牌组或创建新牌组 "智能翻译"
-6. 点击"导入"完成
-
-💡 卡片内容预览:
-"""
-        
-        # 添加卡片内容预览
-        front, back = self.format_anki_card(card_data)
-        instructions += f"正面: {front}\n"
-        instructions += f"背面: {back.replace('<br>', ' | ').replace('<b>', '').replace('</b>', '')}\n\n"
-        
-        instructions += """🎨 推荐设置:
-- 牌组名称: 智能翻译
-- 卡片模板: 基础模板
-- 复习间隔: 根据个人情况调整
-
-✨ 单文件优势:
-- 独立管理，便于选择性学习
-- 避免重复导入
-- 便于分享特定单词
-
-祝学习愉快！🎉
-"""
-        
-        try:
-            with open(instruction_file, 'w', encoding='utf-8') as f:
-                f.write(instructions)
-        except Exception as e:
-            print(f"❌ 创建单个卡片导入说明失败: {e}")
-    
     def create_anki_card_data(self, input_text, category, result):
         """创建Anki卡片数据"""
         card_data = {
@@ -1426,47 +1535,98 @@ class SmartTranslator:
         """更新卡片计数"""
         self.cards_count_label.configure(text=f"词卡数量: {len(self.cards_data)}")
     
-    def export_anki(self):
-        """导出Anki卡片 - 每个单词单独生成一个文件"""
+    def export_anki(self, incremental=False):
+        """导出Anki卡片 - 所有卡片一次写入单个TSV文件，并可同时生成.apkg牌组包
+        
+        incremental=True 时只导出上次导出后新增或内容变化的卡片
+        """
         if not self.cards_data:
             messagebox.showwarning("提示", "没有卡片可以导出")
             return
         
+        manifest = ExportManifest(self.anki_folder / "export_manifest.json")
+        
+        # 每张卡片只格式化一次，筛选出需要导出的卡片
+        notes = []
+        failed_exports = []
+        type_counts = {}
+        skipped_count = 0
+        for i, card in enumerate(self.cards_data, 1):
+            word = card.get('word', card.get('input', f'卡片{i}'))
+            try:
+                front, back, tags = self.build_anki_note(card)
+            except Exception as e:
+                failed_exports.append((word, str(e)))
+                continue
+            
+            key = CardStore.normalize_key(card['input'])
+            digest = ExportManifest.digest(front, back, tags)
+            if incremental and not manifest.is_changed(key, digest):
+                skipped_count += 1
+                continue
+            
+            notes.append((key, digest, front, back, tags))
+            type_counts[card['type']] = type_counts.get(card['type'], 0) + 1
+        
+        if not notes and not failed_exports:
+            messagebox.showinfo("提示", f"没有新增或修改的卡片（上次导出: {manifest.last_export}）")
+            return
+        
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        export_folder = self.anki_folder / f"导出_{timestamp}"
+        export_folder = self.anki_folder / f"{'增量导出' if incremental else '导出'}_{timestamp}"
         export_folder.mkdir(exist_ok=True)
         
-        exported_files = []
-        failed_exports = []
+        txt_file = export_folder / f"智能翻译卡片_{timestamp}.txt"
+        apkg_file = export_folder / f"智能翻译卡片_{timestamp}.apkg" if self.export_apkg else None
         
         try:
-            for i, card in enumerate(self.cards_data, 1):
-                # 为每个卡片创建单独的文件
-                word = card.get('word', card.get('input', f'卡片{i}'))
-                # 清理文件名中的特殊字符
-                safe_word = self.sanitize_filename(word)
-                filename = export_folder / f"{safe_word}_{timestamp}.txt"
-                
+            with open(txt_file, 'w', encoding='utf-8') as f:
+                # Anki 2.1.54+ 识别文件头，导入时自动设置分隔符、HTML和标签列
+                f.write("#separator:tab\n#html:true\n#tags column:3\n")
+                for _, _, front, back, tags in notes:
+                    f.write(self.format_anki_tsv_line(front, back, tags))
+            
+            apkg_failed = False
+            if apkg_file is not None:
                 try:
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        front, back = self.format_anki_card(card)
-                        f.write(f"{front}\t{back}\t智能翻译\n")
-                    
-                    exported_files.append((word, filename))
-                    
+                    ApkgWriter("阅读中的收获").write(
+                        apkg_file, ((front, back, tags) for _, _, front, back, tags in notes))
+                except Exception as e:
+                    print(f"⚠️ 生成.apkg牌组包失败: {e}")
+                    apkg_file = None
+                    apkg_failed = True
+            
+            if apkg_failed:
+                # 卡片没有全部写出，不更新导出清单，下次增量导出时重新导出这些卡片
+                print("⚠️ 牌组包未生成，本次导出不记录到导出清单")
+            else:
+                # 记录已导出的内容，下次增量导出时跳过
+                for key, digest, _, _, _ in notes:
+                    manifest.mark(key, digest)
+                try:
+                    manifest.save()
                 except Exception as e:
-                    failed_exports.append((word, str(e)))
+                    print(f"⚠️ 保存导出清单失败: {e}")
+            
+            success_count = len(notes)
             
             # 创建批量导入说明
-            self.create_batch_import_instructions(export_folder, exported_files, failed_exports)
+            self.create_batch_import_instructions(export_folder, txt_file, apkg_file, success_count,
+                                                  failed_exports, type_counts, skipped_count)
             
             # 显示导出结果
-            success_count = len(exported_files)
             fail_count = len(failed_exports)
             
             result_msg = f"✅ 成功导出 {success_count} 个单词卡片"
+            if skipped_count > 0:
+                result_msg += f"\n⏭️ 未变化跳过 {skipped_count} 个"
             if fail_count > 0:
                 result_msg += f"\n❌ 失败 {fail_count} 个"
+            result_msg += f"\n📄 TSV文件: {txt_file.name}"
+            if apkg_file is not None:
+                result_msg += f"\n📦 牌组包: {apkg_file.name}"
+            elif apkg_failed:
+                result_msg += "\n⚠️ 牌组包生成失败，下次增量导出时会重新导出这些卡片"
             result_msg += f"\n📁 导出位置: {export_folder}"
             
             messagebox.showinfo("导出完成", result_msg)
@@ -1474,6 +1634,12 @@ class SmartTranslator:
         except Exception as e:
             messagebox.showerror("错误", f"导出失败: {str(e)}")
     
+    def format_anki_tsv_line(self, front, back, tags):
+        """格式化为Anki TSV行（正面\t背面\t标签）"""
+        front = front.replace('\t', ' ').replace('\n', ' ')
+        back = back.replace('\t', ' ').replace('\n', '<br>')
+        return f"{front}\t{back}\t{' '.join(tags)}\n"
+    
     def sanitize_filename(self, filename):
         """清理文件名中的特殊字符"""
         # 移除或替换不安全的字符
@@ -1486,7 +1652,15 @@ class SmartTranslator:
         return safe_name
     
     def format_anki_card(self, card):
-        """格式化Anki卡片"""
+        """格式化Anki卡片（同一张卡片在同一模板版本下只渲染一次）"""
+        rendered = self.cards_data.get_rendered(card, self.card_template_version)
+        if rendered is None:
+            rendered = self.render_anki_card(card)
+            self.cards_data.set_rendered(card, self.card_template_version, rendered)
+        return rendered
+    
+    def render_anki_card(self, card):
+        """渲染Anki卡片的正面和背面"""
         if card['type'] == 'dictionary':
             # 词典卡片格式
             front = card['word']
@@ -1528,77 +1702,73 @@ class SmartTranslator:
         
         return front, back
     
-    def create_batch_import_instructions(self, export_folder, exported_files, failed_exports):
+    def create_batch_import_instructions(self, export_folder, txt_file, apkg_file, success_count,
+                                         failed_exports, type_counts, skipped_count=0):
         """创建批量导入说明"""
         instruction_file = export_folder / "📋_Anki导入说明.txt"
         
         instructions = f"""🧠 智能分类翻译器 - 批量Anki卡片导入说明
 
 导出文件夹: {export_folder.name}
-成功导出: {len(exported_files)} 个单词卡片
+成功导出: {success_count} 个单词卡片
 失败导出: {len(failed_exports)} 个
+未变化跳过: {skipped_count} 个
 导出时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 📊 导出统计:
 """
         
-        # 统计卡片类型
-        dict_count = sum(1 for card in self.cards_data if card['type'] == 'dictionary')
-        trans_count = sum(1 for card in self.cards_data if card['type'] == 'translation')
+        # 统计导出的卡片类型
+        dict_count = type_counts.get('dictionary', 0)
+        trans_count = type_counts.get('translation', 0)
         
         instructions += f"   • 词典卡片: {dict_count} 张\n"
         instructions += f"   • 翻译卡片: {trans_count} 张\n\n"
         
-        # 添加成功导出的文件列表
-        if exported_files:
-            instructions += "✅ 成功导出的文件:\n"
-            for word, filepath in exported_files:
-                instructions += f"   • {word} → {filepath.name}\n"
-            instructions += "\n"
+        # 导出的文件
+        instructions += "✅ 导出的文件:\n"
+        instructions += f"   • {txt_file.name}（本次导出的卡片，制表符分隔）\n"
+        if apkg_file is not None:
+            instructions += f"   • {apkg_file.name}（Anki牌组包）\n"
+        instructions += "\n"
         
-        # 添加失败的文件列表
+        # 添加失败的卡片列表
         if failed_exports:
-            instructions += "❌ 导出失败的文件:\n"
+            instructions += "❌ 导出失败的卡片:\n"
             for word, error in failed_exports:
                 instructions += f"   • {word}: {error}\n"
             instructions += "\n"
         
-        instructions += """🚀 批量导入步骤:
+        instructions += f"""🚀 导入步骤:
 
-方法1: 逐个导入（推荐）
+方法1: 导入牌组包（推荐）
 1. 打开Anki软件
-2. 对每个.txt文件重复以下步骤:
-   a) 点击"导入文件"或使用快捷键 Ctrl+Shift+I (Mac: Cmd+Shift+I)
-   b) 选择单个.txt文件
-   c) 设置导入选项:
-      - 字段分隔符: 制表符 (Tab)
-      - 字段映射: 字段1→正面, 字段2→背面, 字段3→标签
-   d) 选择目标牌组 "智能翻译"
-   e) 点击"导入"
+2. 双击 .apkg 文件，或点击"导入文件"选择 .apkg 文件
+3. 卡片自动进入牌组 "阅读中的收获"，无需设置字段映射
 
-方法2: 合并导入
-1. 可以将多个.txt文件内容合并到一个文件中
-2. 然后按照单文件导入方式处理
+方法2: 导入TSV文件
+1. 打开Anki软件
+2. 点击"导入文件"或使用快捷键 Ctrl+Shift+I (Mac: Cmd+Shift+I)
+3. 选择 {txt_file.name}
+4. 设置导入选项（Anki 2.1.54+ 会根据文件头自动设置）:
+   - 字段分隔符: 制表符 (Tab)
+   - 允许HTML: 是
+   - 字段映射: 字段1→正面, 字段2→背面, 字段3→标签
+5. 选择目标牌组 "阅读中的收获"
+6. 点击"导入"
 
 📁 文件说明:
-- 每个单词对应一个独立的.txt文件
-- 文件名格式: 单词_时间戳.txt
-- 每个文件包含一张Anki卡片
+- 所有卡片一次性写入同一个文件，只需导入一次
+- 每行一张卡片: 正面<Tab>背面<Tab>标签
 
 💡 使用建议:
-- 建议创建专门的"智能翻译"牌组
+- 重复导入时选择"更新已有笔记"，避免重复卡片
 - 可以为不同类型的卡片设置不同标签
 - 词典卡片适合单词记忆，翻译卡片适合语感培养
 
 🎨 推荐卡片模板:
-正面: {{Front}}
-背面: {{Back}}
-
-✨ 单文件优势:
-- 便于单独管理每个单词
-- 可以选择性导入需要的单词
-- 避免重复导入已学会的单词
-- 便于分类和整理
+正面: {{{{Front}}}}
+背面: {{{{Back}}}}
 
 祝学习愉快！🎉
 """
@@ -1619,6 +1789,11 @@ class SmartTranslator:
         result = messagebox.askyesno("确认", f"确定要清空所有 {len(self.cards_data)} 张卡片吗？")
         if result:
             self.cards_data.clear()
+            try:
+                self.card_journal.append_clear()
+                self.card_journal.maybe_compact(self.cards_data)
+            except Exception as e:
+                print(f"⚠️ 写入词卡日志失败: {e}")
             self.update_cards_count()
             messagebox.showinfo("成功", "✅ 已清空所有卡片")
     
@@ -1636,7 +1811,17 @@ class SmartTranslator:
         except Exception as e:
             print(f"❌ 程序运行出错: {e}")
         finally:
+            self.anki_outbox.stop()
+            self.card_journal.close()
+            self.engine.shutdown()
+            self.print_connection_stats()
             print("👋 智能分类翻译器已关闭")
+    
+    def print_connection_stats(self):
+        """输出连接复用统计"""
+        for host, stats in get_connection_stats(self.session).items():
+            print(f"🔌 {host}: 请求 {stats['requests']} 次, "
+                  f"新建连接 {stats['connections']} 个, 复用 {stats['reused']} 次")
 
 if __name__ == "__main__":
     try:
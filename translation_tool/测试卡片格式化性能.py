@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试卡片格式化性能
+对比逐次解析模板的旧实现和预编译模板的 AnkiExporter.format_card_side，
+并确认两者输出一致（旧实现只把三个<br>合并为两个，连续四个以上的<br>合并不完全；
+预编译实现会把整段合并为两个，这类输入的输出不再相同）
+
+用法:
+    python3 测试卡片格式化性能.py --cards 20000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from anki_exporter import AnkiExporter
+
+
+def legacy_format_card_side(template, card):
+    """旧实现：每次构建数据字典、str.format 解析模板、逐个 replace 清理"""
+    data = {
+        'word': card.get('word', ''),
+        'phonetic': card.get('phonetic', ''),
+        'translations': card.get('translations', ''),
+        'definitions': card.get('definitions', ''),
+        'examples': card.get('examples', ''),
+        'created_time': card.get('created_time', '')
+    }
+    for key, value in data.items():
+        if not value:
+            data[key] = ''
+        elif key == 'phonetic' and value:
+            data[key] = f"[{value}]"
+
+    try:
+        text = template.format(**data)
+    except KeyError:
+        return f"{data['word']} - {data['translations']}"
+    text = text.replace('<br><br><br>', '<br><br>')
+    text = text.replace('<br><br> <br>', '<br><br>')
+    text = text.replace('<b></b>', '')
+    text = text.replace('<i></i>', '')
+    return text.strip()
+
+
+# 清理逻辑的边界输入（无占位符的模板，原样进入清理步骤）
+CLEANUP_CASES = [
+    'a<br><br><br> <br>',
+    'a<br><br><br>b',
+    'a<br><br> <br>b',
+    '<b></b>a<i></i>',
+    '<br><b></b><br><br>',
+]
+
+
+def generate_cards(count):
+    """生成测试卡片（部分字段为空，覆盖清理逻辑）"""
+    cards = []
+    for i in range(count):
+        cards.append({
+            'word': f'word{i}',
+            'phonetic': '/wɜːd/' if i % 3 else '',
+            'translations': '单词；话语' if i % 5 else '',
+            'definitions': 'n. 单词；消息；诺言' if i % 4 else '',
+            'examples': f'Example sentence number {i}.' if i % 2 else '',
+            'created_time': '2024-01-01 12:00:00'
+        })
+    return cards
+
+
+def measure(func, cards, sides, repeat):
+    """返回多次运行中的最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for card in cards:
+            for side in sides:
+                func(side, card)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="卡片格式化性能测试")
+    parser.add_argument("--cards", type=int, default=20000, help="测试卡片数量（默认20000）")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快一次（默认3）")
+    args = parser.parse_args(argv)
+
+    exporter = AnkiExporter()
+    cards = generate_cards(args.cards)
+
+    print("⏱️ 卡片格式化性能测试")
+    print(f"📊 卡片数量: {args.cards}, 重复 {args.repeat} 次取最快")
+    print("=" * 60)
+
+    mismatches = sum(1 for side in CLEANUP_CASES
+                     if legacy_format_card_side(side, {}) != exporter.format_card_side(side, {}))
+    print(f"🧹 清理边界输入输出一致: {'✅' if mismatches == 0 else f'❌ {mismatches} 处不同'}")
+    print()
+
+    for key, template_config in exporter.templates.items():
+        sides = [template_config['front'], template_config['back']]
+
+        # 确认输出一致
+        mismatches = sum(1 for card in cards for side in sides
+                         if legacy_format_card_side(side, card) != exporter.format_card_side(side, card))
+
+        legacy_time = measure(legacy_format_card_side, cards, sides, args.repeat)
+        compiled_time = measure(exporter.format_card_side, cards, sides, args.repeat)
+        renders = args.cards * len(sides)
+
+        print(f"🎨 {template_config['name']} ({key})")
+        print(f"   旧实现:   {legacy_time * 1000:8.1f}ms  ({renders / legacy_time:,.0f} 次/秒)")
+        print(f"   预编译:   {compiled_time * 1000:8.1f}ms  ({renders / compiled_time:,.0f} 次/秒)")
+        print(f"   加速比:   {legacy_time / compiled_time:.2f}x")
+        print(f"   输出一致: {'✅' if mismatches == 0 else f'❌ {mismatches} 处不同'}")
+        print()
+
+
+if __name__ == "__main__":
+    main()